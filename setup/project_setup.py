@@ -1,77 +1,48 @@
+import argparse
+import hashlib
+import importlib.metadata
 import os
+import re
+import shutil
 import subprocess
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def create_virtual_environment():
-    """Cria ambiente virtual para o projeto"""
-    print("🔧 Criando ambiente virtual...")
-    try:
-        subprocess.run([sys.executable, "-m", "venv", "venv"], check=True)
-        print("✅ Ambiente virtual criado: ./venv/")
-        
-        # Instruções de ativação
-        if os.name == 'nt':  # Windows
-            print("💡 Para ativar: venv\\Scripts\\activate")
-        else:  # Linux/Mac
-            print("💡 Para ativar: source venv/bin/activate")
-            
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Erro ao criar ambiente virtual: {e}")
+# Dependências do projeto (fonte única do requirements.in gerado)
+REQUIREMENTS = (
+    "pandas>=1.5.0",
+    "numpy>=1.21.0",
+    "matplotlib>=3.5.0",
+    "seaborn>=0.11.0",
+    "jupyter>=1.0.0",
+    "openpyxl>=3.0.0",
+    "jinja2>=3.0.0",
+    "xlrd>=2.0.0",
+    "scipy>=1.7.0",
+    "python-dateutil>=2.8.0",
+)
 
-def install_requirements():
-    """Instala dependências do projeto"""
-    print("\n📦 Instalando dependências...")
-    requirements = """
-pandas>=1.5.0
-numpy>=1.21.0
-matplotlib>=3.5.0
-seaborn>=0.11.0
-jupyter>=1.0.0
-openpyxl>=3.0.0
-xlrd>=2.0.0
-scipy>=1.7.0
-python-dateutil>=2.8.0
-    """.strip()
-    
-    # Criar arquivo requirements.txt
-    with open('requirements.txt', 'w') as f:
-        f.write(requirements)
-    
-    try:
-        subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"], check=True)
-        print("✅ Dependências instaladas com sucesso!")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Erro ao instalar dependências: {e}")
+# Dependências que podem ser omitidas com --extras (ex.: CI sem notebooks)
+OPTIONAL_REQUIREMENTS = frozenset({'jupyter', 'xlrd'})
 
-def create_directory_structure():
-    """Cria estrutura de diretórios do projeto"""
-    print("\n📁 Criando estrutura de diretórios...")
-    
-    directories = [
-        'data/raw',
-        'data/processed', 
-        'data/sample',
-        'notebooks',
-        'src',
-        'reports/figures',
-        'reports/insights',
-        'exports',
-        'tests'
-    ]
-    
-    for directory in directories:
-        Path(directory).mkdir(parents=True, exist_ok=True)
-        print(f"  📂 {directory}/")
-    
-    print("✅ Estrutura de diretórios criada!")
+# Caches locais ao projeto (sobrevivem à limpeza do ~/.cache feita por runners de CI)
+CACHE_DIR = Path('.cache')
+WHEELS_DIR = CACHE_DIR / 'wheels'
+DEPS_HASH_DIR = CACHE_DIR / 'deps'
 
-def create_gitignore():
-    """Cria arquivo .gitignore"""
-    print("\n📝 Criando .gitignore...")
-    
-    gitignore_content = """
-# Python
+# Comando de ativação do venv para esta plataforma
+if os.name == 'nt':  # Windows
+    ACTIVATE_HINT = "venv\\Scripts\\activate"
+else:  # Linux/Mac
+    ACTIVATE_HINT = "source venv/bin/activate"
+
+# uv cria ambientes e instala pacotes bem mais rápido que venv/pip (sem ensurepip)
+UV_PATH = shutil.which('uv')
+
+# Conteúdo dos arquivos gerados, já codificado em UTF-8
+GITIGNORE_CONTENT = """# Python
 __pycache__/
 *.py[cod]
 *$py.class
@@ -132,19 +103,12 @@ Thumbs.db
 # Logs
 *.log
 logs/
-    """.strip()
-    
-    with open('.gitignore', 'w') as f:
-        f.write(gitignore_content)
-    
-    print("✅ .gitignore criado!")
 
-def create_readme_sample():
-    """Cria README básico se não existir"""
-    if not os.path.exists('README.md'):
-        print("\n📄 Criando README.md...")
-        
-        readme_content = """# 📊 Análise de Vendas E-commerce
+# Cache de dependências
+.cache/
+""".encode('utf-8')
+
+README_CONTENT = """# 📊 Análise de Vendas E-commerce
 
 Projeto de Data Science para análise estratégica de vendas de e-commerce.
 
@@ -182,12 +146,284 @@ python main.py
 ## 📧 Contato
 
 [Seu Nome] - [seu.email@exemplo.com]
-"""
-        
-        with open('README.md', 'w', encoding='utf-8') as f:
-            f.write(readme_content)
+""".encode('utf-8')
+
+# Serializa as mensagens dos passos executados em paralelo
+_print_lock = threading.Lock()
+
+def _log(message):
+    """Imprime uma mensagem inteira de uma vez, sem intercalar entre threads"""
+    with _print_lock:
+        print(message)
+
+def _venv_is_reusable():
+    """Verifica se ./venv já existe e foi criado com o mesmo Python (major.minor)"""
+    try:
+        config = (Path('venv') / 'pyvenv.cfg').read_text()
+    except FileNotFoundError:
+        return False
+    # venv grava 'version = X.Y.Z'; uv grava 'version_info = X.Y.Z'
+    version = re.escape(f"{sys.version_info.major}.{sys.version_info.minor}")
+    return re.search(rf"^version(?:_info)?\s*=\s*{version}(?:\.|\s*$)", config, re.MULTILINE) is not None
+
+def _write_if_changed(path, content):
+    """
+    Grava `content` (bytes) em `path` somente se o conteúdo for diferente,
+    preservando o mtime (e os caches baseados nele) quando nada mudou
+    
+    Returns:
+    --------
+    bool: True se o arquivo foi escrito
+    """
+    path = Path(path)
+    try:
+        if path.read_bytes() == content:
+            return False
+    except FileNotFoundError:
+        pass
+    path.write_bytes(content)
+    return True
+
+def start_virtual_environment():
+    """
+    Inicia a criação do ambiente virtual em segundo plano e retorna o processo
+    
+    Returns:
+    --------
+    subprocess.Popen ou None: None se o venv existente puder ser reutilizado
+    """
+    if _venv_is_reusable():
+        _log(f"✅ venv já existe, reutilizando: ./venv/\n💡 Para ativar: {ACTIVATE_HINT}")
+        return None
+    
+    # A dica de ativação já sai agora, enquanto o venv é criado
+    _log(f"🔧 Criando ambiente virtual...\n💡 Para ativar: {ACTIVATE_HINT}")
+    if UV_PATH:
+        cmd = [UV_PATH, "venv", "--python", sys.executable, "venv"]
+    else:
+        cmd = [sys.executable, "-m", "venv", "venv"]
+    # stdout e stderr juntos, para não intercalar com as mensagens do setup
+    return subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+
+def finish_virtual_environment(process):
+    """Aguarda o processo iniciado por start_virtual_environment e reporta o resultado"""
+    output, _ = process.communicate()
+    if process.returncode != 0:
+        _log(f"❌ Erro ao criar ambiente virtual (código {process.returncode}):\n{output}")
+        return
+    
+    _log("✅ Ambiente virtual criado: ./venv/")
+
+def create_virtual_environment():
+    """Cria ambiente virtual para o projeto"""
+    process = start_virtual_environment()
+    if process is not None:
+        finish_virtual_environment(process)
+
+def _pip_command(subcommand, *args):
+    """Monta o comando pip para o Python atual, usando `uv pip` quando disponível"""
+    if UV_PATH:
+        return [UV_PATH, "pip", subcommand, "--quiet", *args, "--python", sys.executable]
+    # Sem checagem de versão do pip nem avisos de PATH: menos trabalho e saída mais limpa
+    quiet = ["--disable-pip-version-check", "--quiet"]
+    if subcommand == "install":
+        quiet.append("--no-warn-script-location")
+    return [sys.executable, "-m", "pip", subcommand, *quiet, *args]
+
+# Restrições "soltas" (>=); as versões exatas ficam nos lockfiles por versão do Python
+REQUIREMENTS_IN_PATH = Path('requirements.in')
+
+def _lock_path():
+    """Caminho do lockfile para a versão atual do Python"""
+    return Path(f"requirements-py{sys.version_info.major}{sys.version_info.minor}.lock")
+
+def generate_lock(env=None):
+    """
+    Gera requirements-pyXY.lock (versões fixas e hashes) a partir do requirements.in
+    
+    Parameters:
+    -----------
+    env : dict, optional
+        Variáveis de ambiente para os subprocessos
+    
+    Returns:
+    --------
+    Path: Caminho do lockfile gerado
+    """
+    lock_path = _lock_path()
+    print(f"🔒 Gerando {lock_path}...")
+    compile_args = ["--generate-hashes", "--output-file", str(lock_path), str(REQUIREMENTS_IN_PATH)]
+    if UV_PATH:
+        subprocess.run(_pip_command("compile", *compile_args), check=True, env=env)
+    else:
+        subprocess.run(_pip_command("install", "pip-tools"), check=True, env=env)
+        subprocess.run([sys.executable, "-m", "piptools", "compile", *compile_args], check=True, env=env)
+    return lock_path
+
+def _requirement_name(requirement):
+    """Nome do pacote de uma especificação como 'pandas>=1.5.0'"""
+    return re.split(r'[<>=!~;\[\s]', requirement.strip(), maxsplit=1)[0]
+
+def _deps_hash_path():
+    """
+    Hash do requirements.in da última instalação bem-sucedida no Python atual
+    
+    As dependências vão para sys.executable (o venv, se ativado, ou o
+    interpretador do sistema com --no-venv), então cada ambiente tem o seu.
+    """
+    prefix = hashlib.blake2b(os.path.abspath(sys.prefix).encode('utf-8'), digest_size=8).hexdigest()
+    return DEPS_HASH_DIR / f"{prefix}.hash"
+
+def _requirements_satisfied(requirements, digest):
+    """Verifica se as dependências já foram instaladas com este mesmo requirements"""
+    try:
+        if _deps_hash_path().read_text().strip() != digest:
+            return False
+    except FileNotFoundError:
+        return False
+    
+    for requirement in requirements:
+        try:
+            importlib.metadata.version(_requirement_name(requirement))
+        except importlib.metadata.PackageNotFoundError:
+            return False
+    return True
+
+def _write_deps_hash(digest):
+    """Grava o hash das dependências instaladas de forma atômica"""
+    hash_path = _deps_hash_path()
+    os.makedirs(hash_path.parent, exist_ok=True)
+    tmp_path = hash_path.with_suffix('.tmp')
+    tmp_path.write_text(digest)
+    tmp_path.replace(hash_path)
+
+def install_requirements(extras=None, ephemeral=False):
+    """
+    Instala dependências do projeto
+    
+    Parameters:
+    -----------
+    extras : set of str, optional
+        Dependências opcionais (OPTIONAL_REQUIREMENTS) a incluir; None inclui todas
+    ephemeral : bool, default False
+        Ambiente descartável (ex.: CI): não gera .pyc durante a instalação
+    """
+    print("\n📦 Instalando dependências...")
+    requirements = [
+        r for r in REQUIREMENTS
+        if extras is None or _requirement_name(r) not in OPTIONAL_REQUIREMENTS or _requirement_name(r) in extras
+    ]
+    
+    # Criar arquivo requirements.in (sem reescrever se não mudou, para manter o lock válido)
+    req_path = REQUIREMENTS_IN_PATH
+    _write_if_changed(req_path, b"\n".join(r.encode('utf-8') for r in requirements) + b"\n")
+    
+    # Nada a fazer se o mesmo requirements já foi instalado e os pacotes resolvem
+    digest = hashlib.blake2b(req_path.read_bytes()).hexdigest()
+    if _requirements_satisfied(requirements, digest):
+        print("✅ Dependências já instaladas, nada a fazer")
+        return
+    
+    # Cache persistente de wheels dentro do projeto e sem checagem de versão do pip
+    os.makedirs(WHEELS_DIR, exist_ok=True)
+    env = {
+        **os.environ,
+        "PIP_CACHE_DIR": str((CACHE_DIR / 'pip').resolve()),
+        "UV_CACHE_DIR": str((CACHE_DIR / 'uv').resolve()),
+        "PIP_DISABLE_PIP_VERSION_CHECK": "1",
+    }
+    # uv já não compila bytecode por padrão; o pip precisa de --no-compile
+    no_compile = []
+    if ephemeral:
+        env["PYTHONDONTWRITEBYTECODE"] = "1"
+        if not UV_PATH:
+            no_compile = ["--no-compile"]
+    lock_path = _lock_path()
+    
+    try:
+        # Gerar lockfile com hashes apenas se ausente ou desatualizado
+        if not lock_path.exists() or lock_path.stat().st_mtime < req_path.stat().st_mtime:
+            generate_lock(env)
         
-        print("✅ README.md criado!")
+        # Somente wheels: evita compilar sdists (numpy, scipy) na instalação
+        install_cmd = _pip_command("install", "--require-hashes", "--no-deps", *no_compile, "-r", str(lock_path))
+        binary_only = ["--only-binary=:all:"] if UV_PATH else ["--only-binary=:all:", "--prefer-binary"]
+        try:
+            if UV_PATH:
+                # uv já mantém seu próprio cache de wheels (UV_CACHE_DIR)
+                subprocess.run(install_cmd + binary_only, check=True, env=env)
+            else:
+                # Baixar as wheels para .cache/wheels só quando o lock mudar, e instalar offline a partir delas
+                lock_digest = hashlib.sha256(lock_path.read_bytes()).hexdigest()
+                wheels_stamp = WHEELS_DIR / '.lock.sha256'
+                if not wheels_stamp.exists() or wheels_stamp.read_text() != lock_digest:
+                    subprocess.run(_pip_command("wheel", "--require-hashes", "--no-deps", "-r", str(lock_path),
+                                                "-w", str(WHEELS_DIR), *binary_only), check=True, env=env)
+                    wheels_stamp.write_text(lock_digest)
+                subprocess.run(_pip_command("install", "--require-hashes", "--no-deps", *no_compile, "--no-index",
+                                            "--find-links", str(WHEELS_DIR), "-r", str(lock_path)),
+                               check=True, env=env)
+        except subprocess.CalledProcessError:
+            print("⚠️ Nem todos os pacotes têm wheel para esta plataforma; instalando a partir do código-fonte (mais lento)...")
+            subprocess.run(install_cmd, check=True, env=env)
+        _write_deps_hash(digest)
+        print("✅ Dependências instaladas com sucesso!")
+    except subprocess.CalledProcessError as e:
+        print(f"❌ Erro ao instalar dependências: {e}")
+
+def create_directory_structure():
+    """Cria estrutura de diretórios do projeto"""
+    header = "\n📁 Criando estrutura de diretórios..."
+    directories = [
+        'data/raw',
+        'data/processed', 
+        'data/sample',
+        'notebooks',
+        'src',
+        'reports/figures',
+        'reports/insights',
+        'exports',
+        'tests'
+    ]
+    
+    # Re-execução: um único scandir da raiz já descarta o caso comum de tudo existir
+    existing = {entry.name for entry in os.scandir('.') if entry.is_dir()}
+    if {d.split('/')[0] for d in directories} <= existing and all(os.path.isdir(d) for d in directories):
+        _log(f"{header}\n✅ Estrutura de diretórios já existe!")
+        return
+    
+    # Criar cada componente uma única vez (data/ e reports/ são compartilhados)
+    created = set()
+    lines = [header]
+    for directory in sorted(directories):
+        parts = directory.split('/')
+        for i in range(len(parts)):
+            prefix = '/'.join(parts[:i + 1])
+            if prefix in created:
+                continue
+            try:
+                os.mkdir(prefix)
+            except FileExistsError:
+                pass
+            created.add(prefix)
+        lines.append(f"  📂 {directory}/")
+    
+    # Uma única escrita no stdout em vez de uma por diretório
+    lines.append("✅ Estrutura de diretórios criada!")
+    _log("\n".join(lines))
+
+def create_gitignore():
+    """Cria arquivo .gitignore"""
+    if _write_if_changed('.gitignore', GITIGNORE_CONTENT):
+        _log("\n📝 Criando .gitignore...\n✅ .gitignore criado!")
+    else:
+        _log("\n📝 Criando .gitignore...\n✅ .gitignore já está atualizado!")
+
+def create_readme_sample():
+    """Cria README básico se não existir"""
+    if not os.path.exists('README.md'):
+        _write_if_changed('README.md', README_CONTENT)
+        _log("\n📄 Criando README.md...\n✅ README.md criado!")
 
 def create_gitkeep_files():
     """Cria arquivos .gitkeep para manter diretórios vazios no Git"""
@@ -198,34 +434,72 @@ def create_gitkeep_files():
         'reports/insights'
     ]
     
+    # Basta o arquivo existir: o git não se importa com o mtime
     for directory in gitkeep_dirs:
-        gitkeep_path = Path(directory) / '.gitkeep'
-        gitkeep_path.touch()
+        gitkeep_path = os.path.join(directory, '.gitkeep')
+        if os.path.lexists(gitkeep_path):
+            continue
+        fd = os.open(gitkeep_path, os.O_CREAT | os.O_WRONLY, 0o644)
+        os.close(fd)
     
-    print("📌 Arquivos .gitkeep criados para manter estrutura no Git")
+    _log("📌 Arquivos .gitkeep criados para manter estrutura no Git")
+
+def parse_args(argv=None):
+    """Lê as opções de linha de comando do setup"""
+    parser = argparse.ArgumentParser(description="Setup do projeto de análise de vendas e-commerce")
+    parser.add_argument('--venv', dest='venv', action='store_true', default=None,
+                        help="Criar ambiente virtual sem perguntar")
+    parser.add_argument('--no-venv', dest='venv', action='store_false',
+                        help="Não criar ambiente virtual")
+    parser.add_argument('--install', dest='install', action='store_true', default=None,
+                        help="Instalar dependências sem perguntar")
+    parser.add_argument('--no-install', dest='install', action='store_false',
+                        help="Não instalar dependências")
+    parser.add_argument('--extras', default=None,
+                        help=f"Dependências opcionais a instalar, separadas por vírgula "
+                             f"({','.join(sorted(OPTIONAL_REQUIREMENTS))}); padrão: todas. Use '' para nenhuma")
+    parser.add_argument('--ephemeral', action='store_true',
+                        help="Ambiente descartável (CI): instala sem gerar bytecode (.pyc)")
+    return parser.parse_args(argv)
+
+def _confirm(flag, question):
+    """Usa a flag se informada; senão pergunta no terminal (ou assume 'sim' fora de um TTY, ex.: CI)"""
+    if flag is not None:
+        return flag
+    if not sys.stdin.isatty():
+        return True
+    return input(question).lower() in {'y', 'yes', 'sim', 's'}
 
-def setup_project():
+def setup_project(args=None):
     """Executa setup completo do projeto"""
+    if args is None:
+        args = parse_args([])
+    
     print("🎯 SETUP DO PROJETO - ANÁLISE DE VENDAS E-COMMERCE")
     print("="*60)
     
-    # Criar estrutura de diretórios
+    want_venv = _confirm(args.venv, "\n❓ Deseja criar ambiente virtual? (y/n): ")
+    want_install = _confirm(args.install, "❓ Deseja instalar dependências? (y/n): ")
+    
+    # Ambiente virtual (opcional): roda em segundo plano enquanto os arquivos são gerados
+    venv_process = start_virtual_environment() if want_venv else None
+    
+    # Criar estrutura de diretórios (os .gitkeep dependem dela)
     create_directory_structure()
     
-    # Criar arquivos de configuração
-    create_gitignore()
-    create_readme_sample()
-    create_gitkeep_files()
+    # Criar arquivos de configuração em paralelo (arquivos independentes)
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        futures = [executor.submit(step) for step in (create_gitignore, create_readme_sample, create_gitkeep_files)]
+        for future in futures:
+            future.result()
     
-    # Ambiente virtual (opcional)
-    response = input("\n❓ Deseja criar ambiente virtual? (y/n): ").lower()
-    if response in ['y', 'yes', 'sim', 's']:
-        create_virtual_environment()
+    if venv_process is not None:
+        finish_virtual_environment(venv_process)
     
     # Instalar dependências
-    response = input("❓ Deseja instalar dependências? (y/n): ").lower()
-    if response in ['y', 'yes', 'sim', 's']:
-        install_requirements()
+    if want_install:
+        extras = None if args.extras is None else {e.strip() for e in args.extras.split(',') if e.strip()}
+        install_requirements(extras, ephemeral=args.ephemeral)
     
     print("\n" + "="*60)
     print("✅ SETUP CONCLUÍDO COM SUCESSO!")
@@ -239,4 +513,4 @@ def setup_project():
     print("-"*60)
 
 if __name__ == "__main__":
-    setup_project()
\ No newline at end of file
+    setup_project(parse_args())
\ No newline at end of file
@@ -1,8 +1,82 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import warnings
-warnings.filterwarnings('ignore')
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+
+# Colunas usadas como chave de groupby/nunique; texto é convertido para category
+KEY_COLUMNS = ('cliente_id', 'produto', 'categoria', 'estado', 'canal_venda')
+
+# Acima desta fração de valores distintos, category não compensa (quase uma categoria por linha)
+# e a coluna usa strings do Arrow, se o pyarrow estiver instalado
+LIMITE_CARDINALIDADE_CATEGORY = 0.5
+
+# Colunas de baixa cardinalidade gravadas com dictionary encoding no Parquet
+PARQUET_DICTIONARY_COLUMNS = ('categoria', 'canal_venda', 'estado', 'produto')
+
+# Segmentos RFV e score mínimo de cada um (o último segmento recebe o restante)
+SEGMENTOS_RFV = ('Champions', 'Loyal Customers', 'Potential Loyalists',
+                 'At Risk', 'Cannot Lose Them', 'Hibernating')
+SEGMENTOS_RFV_LIMITES = (13, 11, 9, 7, 5)
+
+# Nomes dos dias da semana na ordem de dt.dayofweek (mesmos rótulos de dt.day_name())
+DIAS_SEMANA = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+def _rfv_por_cliente_numpy(codigos, datas, valores, n_clientes):
+    """Última data, número de pedidos e valor total por código de cliente (0..n_clientes-1)"""
+    ultima = np.full(n_clientes, np.iinfo(np.int64).min)  # NaT enquanto não houver data
+    np.maximum.at(ultima, codigos, datas)
+    return (ultima,
+            np.bincount(codigos, minlength=n_clientes),
+            np.bincount(codigos, weights=valores, minlength=n_clientes))
+
+
+def _rfv_por_cliente_loop(codigos, datas, valores, n_clientes):
+    """Mesma redução de `_rfv_por_cliente_numpy`, em uma única varredura para o numba"""
+    ultima = np.full(n_clientes, np.iinfo(np.int64).min)
+    contagem = np.zeros(n_clientes, dtype=np.int64)
+    total = np.zeros(n_clientes, dtype=np.float64)
+    for i in range(len(codigos)):
+        cliente = codigos[i]
+        if datas[i] > ultima[cliente]:
+            ultima[cliente] = datas[i]
+        contagem[cliente] += 1
+        total[cliente] += valores[i]
+    return ultima, contagem, total
+
+
+try:
+    from numba import njit
+    # Kernel serial: não concorre por threads com quem chama o analisador
+    _rfv_por_cliente = njit(cache=True)(_rfv_por_cliente_loop)
+except ImportError:  # numba é opcional
+    _rfv_por_cliente = _rfv_por_cliente_numpy
+
+
+def _quintil(valores):
+    """Índice do quintil (0-4) de cada valor, com os mesmos limites de pd.qcut"""
+    limites = np.quantile(valores, [0.2, 0.4, 0.6, 0.8])
+    return np.searchsorted(limites, valores, side='left').astype(np.int8)
+
+
+def _quintil_rank(valores):
+    """Quintil (0-4) da posição de cada valor; empates desempatados pela ordem de aparição"""
+    n = len(valores)
+    ranks = np.empty(n, dtype=np.int64)
+    ranks[np.argsort(valores, kind='stable')] = np.arange(n)
+    return (ranks * 5 // max(n, 1)).astype(np.int8)
+
+def _coluna_texto_chave(serie):
+    """Category para texto de baixa cardinalidade; string[pyarrow] quando há valores demais"""
+    categorica = serie.astype('category')
+    if len(categorica.cat.categories) <= LIMITE_CARDINALIDADE_CATEGORY * len(serie):
+        return categorica
+    try:
+        return serie.astype('string[pyarrow]')
+    except ImportError:  # pyarrow é opcional
+        return categorica
 
 class BusinessAnalyzer:
     """Classe para análise estratégica de dados de e-commerce"""
@@ -16,9 +90,258 @@ class BusinessAnalyzer:
         data : pd.DataFrame
             DataFrame com dados de vendas processados
         """
-        self.data = data
+        self.data = self._prepare_data(data)
         self.insights = {}
+        self._n_unique = {}
+        self._partes_data = None
+        self._prod_agg = None
+    
+    @classmethod
+    def from_parquet(cls, path, date_from=None, date_to=None, columns=None):
+        """
+        Cria o analisador a partir de um dataset Parquet (requer pyarrow)
+        
+        O filtro de datas é aplicado pelo leitor: row groups fora da janela
+        são descartados pelas estatísticas do arquivo, sem serem lidos.
+        
+        Parameters:
+        -----------
+        path : str
+            Arquivo ou diretório Parquet (ver save_parquet)
+        date_from : str or datetime, optional
+            Data mínima de data_pedido (inclusiva)
+        date_to : str or datetime, optional
+            Data máxima de data_pedido (inclusiva)
+        columns : list, optional
+            Colunas a carregar (padrão: todas)
+            
+        Returns:
+        --------
+        BusinessAnalyzer: Analisador com os dados carregados
+        """
+        import pyarrow.dataset as ds
+        
+        filtro = None
+        if date_from is not None:
+            filtro = ds.field('data_pedido') >= pd.Timestamp(date_from).to_pydatetime()
+        if date_to is not None:
+            limite = ds.field('data_pedido') <= pd.Timestamp(date_to).to_pydatetime()
+            filtro = limite if filtro is None else filtro & limite
+        
+        table = ds.dataset(path, format='parquet').to_table(columns=columns, filter=filtro)
+        return cls(table.to_pandas())
+    
+    @staticmethod
+    def save_parquet(data, path):
+        """
+        Salva os dados no formato lido por from_parquet (requer pyarrow)
+        
+        Os pedidos são ordenados por data para que as estatísticas de cada
+        row group permitam descartar períodos inteiros na leitura.
+        
+        Parameters:
+        -----------
+        data : pd.DataFrame
+            DataFrame com dados de vendas processados
+        path : str
+            Caminho do arquivo .parquet
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        
+        if 'data_pedido' in data.columns:
+            data = data.sort_values('data_pedido', kind='stable')
+        table = pa.Table.from_pandas(data, preserve_index=False)
+        pq.write_table(
+            table, path,
+            compression='zstd',
+            use_dictionary=[col for col in PARQUET_DICTIONARY_COLUMNS if col in table.column_names],
+            row_group_size=256_000
+        )
+    
+    @staticmethod
+    def _prepare_data(data):
+        """
+        Converte as colunas-chave de texto para category (ou string[pyarrow],
+        se a cardinalidade for alta), para que groupby e nunique não operem
+        sobre objetos Python
+        
+        O DataFrame recebido não é alterado (cópia rasa, só as colunas convertidas são novas).
+        """
+        data = data.copy(deep=False)
+        for col in KEY_COLUMNS:
+            if col not in data.columns:
+                continue
+            serie = data[col]
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                # Categorias sem uso (ex.: após filtros) distorceriam contagens
+                data[col] = serie.cat.remove_unused_categories()
+            elif pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+                data[col] = _coluna_texto_chave(serie)
+        
+        # Quantidades cabem em inteiros estreitos; valores monetários continuam
+        # float64 (float32 perde centavos em totais acima de ~R$ 100 mil)
+        if 'quantidade' in data.columns and pd.api.types.is_integer_dtype(data['quantidade']):
+            data['quantidade'] = pd.to_numeric(data['quantidade'], downcast='integer')
+        return data
+    
+    # Totais reutilizados por várias análises (self.data não muda após a construção)
+    @cached_property
+    def receita_total(self):
+        return self.data['valor_total'].sum()
+    
+    @cached_property
+    def qtd_total(self):
+        return self.data['quantidade'].sum()
+    
+    @cached_property
+    def n_produtos(self):
+        return self._nunique('produto')
+    
+    @cached_property
+    def n_clientes(self):
+        return self._nunique('cliente_id')
+    
+    @cached_property
+    def n_categorias(self):
+        return self._nunique('categoria')
+    
+    @cached_property
+    def date_min(self):
+        return self.data['data_pedido'].min()
+    
+    @cached_property
+    def date_max(self):
+        return self.data['data_pedido'].max()
+    
+    def _nunique(self, col):
+        """Número de valores distintos de uma coluna, calculado uma única vez"""
+        if col not in self._n_unique:
+            serie = self.data[col]
+            if isinstance(serie.dtype, pd.CategoricalDtype) and not serie.hasnans:
+                self._n_unique[col] = len(serie.cat.categories)
+            else:
+                self._n_unique[col] = serie.nunique()
+        return self._n_unique[col]
+        
+    def _date_parts(self):
+        """Trimestre, mês e dia da semana (0=segunda) de cada pedido, calculados uma única vez"""
+        if self._partes_data is None:
+            datas = self.data['data_pedido'].dt
+            self._partes_data = (datas.quarter.to_numpy(), datas.month.to_numpy(), datas.dayofweek.to_numpy())
+        return self._partes_data
+    
+    def _bc_sum(self, key_col, val_col=None, mask=None):
+        """
+        Soma de val_col (ou número de pedidos, se None) por valor de key_col,
+        via np.bincount sobre os códigos categóricos, sem hashing nem ordenação
+        
+        Parameters:
+        -----------
+        key_col : str
+            Coluna de agrupamento
+        val_col : str, optional
+            Coluna somada (padrão: contagem de linhas)
+        mask : np.ndarray, optional
+            Máscara booleana das linhas consideradas
+            
+        Returns:
+        --------
+        pd.Series: Soma por categoria (zero para categorias sem linhas)
+        """
+        serie = self.data[key_col]
+        if isinstance(serie.dtype, pd.CategoricalDtype):
+            codigos, categorias = serie.cat.codes.to_numpy(), serie.cat.categories
+        else:
+            codigos, categorias = pd.factorize(serie, sort=True)
+        
+        selecao = codigos >= 0  # -1 = valor ausente
+        if mask is not None:
+            selecao &= mask
+        pesos = None if val_col is None else self.data[val_col].to_numpy(dtype=np.float64)[selecao]
+        return pd.Series(np.bincount(codigos[selecao], weights=pesos, minlength=len(categorias)), index=categorias)
+    
+    def _resumo_periodo(self, periodos):
+        """
+        Receita, ticket médio, pedidos e quantidade por período (chaves inteiras
+        pequenas, como trimestre ou mês) via np.bincount
+        """
+        validos = periodos >= 0  # NaN (data ausente) fica de fora
+        chaves = periodos[validos].astype(np.int64)
+        num_pedidos = np.bincount(chaves)
+        receita = np.bincount(chaves, weights=self.data['valor_total'].to_numpy(dtype=np.float64)[validos])
+        quantidade = np.bincount(chaves, weights=self.data['quantidade'].to_numpy(dtype=np.float64)[validos])
+        if pd.api.types.is_integer_dtype(self.data['quantidade']):
+            quantidade = np.rint(quantidade).astype(np.int64)
+        
+        presentes = np.flatnonzero(num_pedidos)
+        return pd.DataFrame({
+            'receita_total': receita[presentes],
+            'ticket_medio': receita[presentes] / num_pedidos[presentes],
+            'num_pedidos': num_pedidos[presentes],
+            'qtd_vendida': quantidade[presentes]
+        }, index=presentes)
+    
+    def _produto_stats(self):
+        """
+        Agregado por (categoria, produto), calculado uma única vez; as análises de
+        produtos e de pricing derivam dele seus totais sem nova passagem pelos dados
+        """
+        if self._prod_agg is None:
+            self._prod_agg = self.data.groupby(['categoria', 'produto'], observed=True, sort=False).agg(
+                preco_medio=('preco_unitario', 'mean'),
+                desvio_preco=('preco_unitario', 'std'),
+                preco_min=('preco_unitario', 'min'),
+                preco_max=('preco_unitario', 'max'),
+                num_precos=('preco_unitario', 'count'),
+                qtd_vendida=('quantidade', 'sum'),
+                receita_total=('valor_total', 'sum'),
+                num_pedidos=('valor_total', 'size')
+            )
+        return self._prod_agg
+    
+    def _rollup_produto_stats(self, nivel):
+        """
+        Reagrupa o agregado (categoria, produto) em um único nível
         
+        Média e desvio de preço são recombinados a partir das somas e somas de
+        quadrados de cada grupo, então o resultado é igual ao groupby direto.
+        
+        Parameters:
+        -----------
+        nivel : str
+            'categoria' ou 'produto'
+        """
+        stats = self._produto_stats()
+        n = stats['num_precos']
+        media = stats['preco_medio']
+        parcial = pd.DataFrame({
+            'num_precos': n,
+            'soma_preco': media * n,
+            'soma_quadrados': stats['desvio_preco'].fillna(0.0) ** 2 * (n - 1) + media * media * n,
+            'preco_min': stats['preco_min'],
+            'preco_max': stats['preco_max'],
+            'qtd_vendida': stats['qtd_vendida'],
+            'receita_total': stats['receita_total'],
+            'num_pedidos': stats['num_pedidos']
+        })
+        rollup = parcial.groupby(level=nivel, observed=True, sort=False).agg({
+            'num_precos': 'sum',
+            'soma_preco': 'sum',
+            'soma_quadrados': 'sum',
+            'preco_min': 'min',
+            'preco_max': 'max',
+            'qtd_vendida': 'sum',
+            'receita_total': 'sum',
+            'num_pedidos': 'sum'
+        })
+        
+        n = rollup['num_precos']
+        rollup['preco_medio'] = rollup['soma_preco'] / n
+        variancia = (rollup['soma_quadrados'] - n * rollup['preco_medio'] ** 2) / (n - 1)
+        rollup['desvio_preco'] = np.sqrt(variancia.clip(lower=0)).where(n > 1)
+        return rollup.drop(columns=['soma_preco', 'soma_quadrados'])
+    
     def calculate_key_metrics(self):
         """
         Calcula métricas principais do negócio
@@ -27,20 +350,25 @@ class BusinessAnalyzer:
         --------
         dict: Dicionário com métricas principais
         """
+        receita_total = self.receita_total
+        periodo_dias = (self.date_max - self.date_min).days
+        num_pedidos = len(self.data)
+        num_clientes = self.n_clientes
+        
         metrics = {
-            'receita_total': self.data['valor_total'].sum(),
-            'ticket_medio': self.data['valor_total'].mean(),
+            'receita_total': receita_total,
+            'ticket_medio': receita_total / num_pedidos,
             'ticket_mediano': self.data['valor_total'].median(),
-            'num_pedidos': len(self.data),
-            'num_produtos': self.data['produto'].nunique(),
-            'num_categorias': self.data['categoria'].nunique(),
-            'num_clientes': self.data['cliente_id'].nunique(),
-            'qtd_total_vendida': self.data['quantidade'].sum(),
-            'data_inicio': self.data['data_pedido'].min(),
-            'data_fim': self.data['data_pedido'].max(),
-            'periodo_dias': (self.data['data_pedido'].max() - self.data['data_pedido'].min()).days,
-            'receita_diaria_media': self.data['valor_total'].sum() / (self.data['data_pedido'].max() - self.data['data_pedido'].min()).days,
-            'pedidos_por_cliente': len(self.data) / self.data['cliente_id'].nunique()
+            'num_pedidos': num_pedidos,
+            'num_produtos': self.n_produtos,
+            'num_categorias': self.n_categorias,
+            'num_clientes': num_clientes,
+            'qtd_total_vendida': self.qtd_total,
+            'data_inicio': self.date_min,
+            'data_fim': self.date_max,
+            'periodo_dias': periodo_dias,
+            'receita_diaria_media': receita_total / periodo_dias,
+            'pedidos_por_cliente': num_pedidos / num_clientes
         }
         
         self.insights['metricas_principais'] = metrics
@@ -54,36 +382,36 @@ class BusinessAnalyzer:
         --------
         dict: Análise de produtos
         """
-        # Top produtos por diferentes métricas
-        top_produtos_receita = self.data.groupby('produto')['valor_total'].sum().sort_values(ascending=False)
-        top_produtos_quantidade = self.data.groupby('produto')['quantidade'].sum().sort_values(ascending=False)
-        top_produtos_pedidos = self.data.groupby('produto').size().sort_values(ascending=False)
+        # Métricas por produto a partir do agregado compartilhado com o pricing
+        produto_stats = self._rollup_produto_stats('produto')
         
-        # Análise de ticket médio por produto
-        ticket_medio_produto = self.data.groupby('produto')['valor_total'].mean().sort_values(ascending=False)
+        # Top produtos por diferentes métricas
+        top_produtos_receita = produto_stats['receita_total'].sort_values(ascending=False)
+        top_produtos_quantidade = produto_stats['qtd_vendida'].nlargest(10)
+        top_produtos_pedidos = produto_stats['num_pedidos'].nlargest(10)
         
         # Produtos com maior margem (assumindo que produtos mais caros têm maior margem)
-        produtos_premium = ticket_medio_produto.head(10)
+        produtos_premium = (produto_stats['receita_total'] / produto_stats['num_pedidos']).nlargest(10)
         
         # Análise de concentração (Pareto)
-        receita_acumulada = top_produtos_receita.cumsum()
-        receita_percentual = (receita_acumulada / receita_acumulada.iloc[-1]) * 100
-        produtos_80_percent = receita_percentual[receita_percentual <= 80].index.tolist()
+        receita_acumulada = np.cumsum(top_produtos_receita.to_numpy())
+        corte_80 = np.searchsorted(receita_acumulada / receita_acumulada[-1] * 100, 80, side='right')
+        produtos_80_percent = top_produtos_receita.index[:corte_80].tolist()
         
         analysis = {
             'top_10_receita': top_produtos_receita.head(10).to_dict(),
-            'top_10_quantidade': top_produtos_quantidade.head(10).to_dict(),
-            'top_10_pedidos': top_produtos_pedidos.head(10).to_dict(),
+            'top_10_quantidade': top_produtos_quantidade.to_dict(),
+            'top_10_pedidos': top_produtos_pedidos.to_dict(),
             'produtos_premium': produtos_premium.to_dict(),
             'concentracao_80_20': {
                 'num_produtos_80_percent': len(produtos_80_percent),
-                'percentual_produtos': len(produtos_80_percent) / self.data['produto'].nunique() * 100,
+                'percentual_produtos': len(produtos_80_percent) / len(produto_stats) * 100,
                 'produtos': produtos_80_percent
             },
             'produto_destaque': {
                 'nome': top_produtos_receita.index[0],
                 'receita': top_produtos_receita.iloc[0],
-                'participacao_receita': top_produtos_receita.iloc[0] / self.data['valor_total'].sum() * 100
+                'participacao_receita': top_produtos_receita.iloc[0] / self.receita_total * 100
             }
         }
         
@@ -98,22 +426,25 @@ class BusinessAnalyzer:
         --------
         dict: Análise de categorias
         """
-        cat_analysis = self.data.groupby('categoria').agg({
+        cat_analysis = self.data.groupby('categoria', observed=True, sort=False).agg({
             'valor_total': ['sum', 'mean', 'median', 'count'],
             'quantidade': 'sum',
             'cliente_id': 'nunique'
-        }).round(2)
+        })
         
         # Flatten column names
         cat_analysis.columns = [f"{col[1]}_{col[0]}" if col[1] else col[0] for col in cat_analysis.columns]
         cat_analysis.columns = ['receita_total', 'ticket_medio', 'ticket_mediano', 'num_pedidos', 'qtd_vendida', 'clientes_unicos']
         
         # Calcular participação de mercado
-        cat_analysis['participacao_receita'] = (cat_analysis['receita_total'] / cat_analysis['receita_total'].sum() * 100).round(1)
-        cat_analysis['receita_por_cliente'] = (cat_analysis['receita_total'] / cat_analysis['clientes_unicos']).round(2)
+        cat_analysis['participacao_receita'] = cat_analysis['receita_total'] / cat_analysis['receita_total'].sum() * 100
+        cat_analysis['receita_por_cliente'] = cat_analysis['receita_total'] / cat_analysis['clientes_unicos']
         
-        # Rankear categorias
-        cat_analysis = cat_analysis.sort_values('receita_total', ascending=False)
+        # Arredondamento único para a saída e ranking das categorias
+        cat_analysis = cat_analysis.round({
+            'receita_total': 2, 'ticket_medio': 2, 'ticket_mediano': 2,
+            'participacao_receita': 1, 'receita_por_cliente': 2
+        }).sort_values('receita_total', ascending=False)
         
         analysis = {
             'resumo_categorias': cat_analysis.to_dict('index'),
@@ -123,12 +454,12 @@ class BusinessAnalyzer:
                 'participacao': cat_analysis.iloc[0]['participacao_receita']
             },
             'categoria_maior_ticket': {
-                'nome': cat_analysis.sort_values('ticket_medio', ascending=False).index[0],
-                'ticket_medio': cat_analysis.sort_values('ticket_medio', ascending=False).iloc[0]['ticket_medio']
+                'nome': cat_analysis['ticket_medio'].idxmax(),
+                'ticket_medio': cat_analysis['ticket_medio'].max()
             },
             'categoria_mais_popular': {
-                'nome': cat_analysis.sort_values('num_pedidos', ascending=False).index[0],
-                'num_pedidos': cat_analysis.sort_values('num_pedidos', ascending=False).iloc[0]['num_pedidos']
+                'nome': cat_analysis['num_pedidos'].idxmax(),
+                'num_pedidos': cat_analysis['num_pedidos'].max()
             }
         }
         
@@ -144,58 +475,64 @@ class BusinessAnalyzer:
         dict: Análise de clientes
         """
         # Data de referência para cálculo de recência
-        data_referencia = self.data['data_pedido'].max()
-        
-        # Análise RFV por cliente
-        rfv_analysis = self.data.groupby('cliente_id').agg({
-            'data_pedido': lambda x: (data_referencia - x.max()).days,  # Recência
-            'pedido_id': 'count',  # Frequência  
-            'valor_total': 'sum'   # Valor
+        datas = self.data['data_pedido'].to_numpy()
+        data_referencia = self.date_max.to_datetime64()
+        
+        # Códigos de cliente na ordem dos ids (a ordem desempata o rank dos scores)
+        codigos, clientes = pd.factorize(self.data['cliente_id'], sort=True)
+        validos = codigos >= 0
+        
+        # Análise RFV por cliente: acumula direto nos arrays por código, sem ordenar os pedidos
+        ultima_compra, frequencia, valor_total = _rfv_por_cliente(
+            codigos[validos],
+            datas[validos].view(np.int64),
+            self.data['valor_total'].to_numpy(dtype=np.float64)[validos],
+            len(clientes)
+        )
+        recencia = (data_referencia - ultima_compra.view(datas.dtype)) // np.timedelta64(1, 'D')
+        rfv_analysis = pd.DataFrame({
+            'recencia': recencia,  # Recência
+            'frequencia': frequencia,  # Frequência
+            'valor_total': valor_total  # Valor
+        }, index=pd.Index(clientes, name='cliente_id'))
+        
+        # Scores RFV (1-5, onde 5 é melhor), em arrays int8
+        score_recencia = 5 - _quintil(recencia)
+        score_frequencia = 1 + _quintil_rank(frequencia)
+        score_valor = 1 + _quintil_rank(valor_total)
+        
+        # Score RFV combinado (máximo 15, cabe em int8)
+        score_rfv = score_recencia + score_frequencia + score_valor
+        
+        # Segmentação de clientes (códigos int8, rótulos só na saída)
+        segmentos = np.select(
+            [score_rfv >= limite for limite in SEGMENTOS_RFV_LIMITES],
+            np.arange(len(SEGMENTOS_RFV_LIMITES), dtype=np.int8),
+            default=len(SEGMENTOS_RFV_LIMITES)
+        ).astype(np.int8)
+        
+        # Estatísticas por segmento (contagens e somas ponderadas pelos códigos, sem groupby)
+        num_clientes = np.bincount(segmentos, minlength=len(SEGMENTOS_RFV))
+        presentes = num_clientes > 0
+        
+        def media_segmento(valores):
+            return np.bincount(segmentos, weights=valores, minlength=len(SEGMENTOS_RFV))[presentes] / num_clientes[presentes]
+        
+        segmento_stats = pd.DataFrame({
+            'recencia_media': media_segmento(recencia),
+            'frequencia_media': media_segmento(frequencia),
+            'valor_medio': media_segmento(valor_total),
+            'num_clientes': num_clientes[presentes],
+            'percentual': num_clientes[presentes] / len(rfv_analysis) * 100
+        }, index=np.array(SEGMENTOS_RFV)[presentes]).round({
+            'recencia_media': 2, 'frequencia_media': 2, 'valor_medio': 2, 'percentual': 1
         })
-        rfv_analysis.columns = ['recencia', 'frequencia', 'valor_total']
-        
-        # Scores RFV (1-5, onde 5 é melhor)
-        rfv_analysis['score_recencia'] = pd.qcut(rfv_analysis['recencia'], 5, labels=[5,4,3,2,1])
-        rfv_analysis['score_frequencia'] = pd.qcut(rfv_analysis['frequencia'].rank(method='first'), 5, labels=[1,2,3,4,5])
-        rfv_analysis['score_valor'] = pd.qcut(rfv_analysis['valor_total'].rank(method='first'), 5, labels=[1,2,3,4,5])
-        
-        # Score RFV combinado
-        rfv_analysis['score_rfv'] = (rfv_analysis['score_recencia'].astype(int) + 
-                                    rfv_analysis['score_frequencia'].astype(int) + 
-                                    rfv_analysis['score_valor'].astype(int))
-        
-        # Segmentação de clientes
-        def segmentar_cliente(score):
-            if score >= 13:
-                return 'Champions'
-            elif score >= 11:
-                return 'Loyal Customers'
-            elif score >= 9:
-                return 'Potential Loyalists'
-            elif score >= 7:
-                return 'At Risk'
-            elif score >= 5:
-                return 'Cannot Lose Them'
-            else:
-                return 'Hibernating'
-        
-        rfv_analysis['segmento'] = rfv_analysis['score_rfv'].apply(segmentar_cliente)
-        
-        # Estatísticas por segmento
-        segmento_stats = rfv_analysis.groupby('segmento').agg({
-            'recencia': 'mean',
-            'frequencia': 'mean', 
-            'valor_total': 'mean',
-            'score_rfv': 'count'
-        }).round(2)
-        segmento_stats.columns = ['recencia_media', 'frequencia_media', 'valor_medio', 'num_clientes']
-        segmento_stats['percentual'] = (segmento_stats['num_clientes'] / len(rfv_analysis) * 100).round(1)
         
         analysis = {
             'total_clientes': len(rfv_analysis),
-            'clientes_ativos_30d': len(rfv_analysis[rfv_analysis['recencia'] <= 30]),
-            'clientes_frequentes': len(rfv_analysis[rfv_analysis['frequencia'] >= 3]),
-            'clientes_alto_valor': len(rfv_analysis[rfv_analysis['valor_total'] >= rfv_analysis['valor_total'].quantile(0.8)]),
+            'clientes_ativos_30d': int((recencia <= 30).sum()),
+            'clientes_frequentes': int((frequencia >= 3).sum()),
+            'clientes_alto_valor': int((valor_total >= np.quantile(valor_total, 0.8)).sum()),
             'segmentacao': segmento_stats.to_dict('index'),
             'top_10_clientes': rfv_analysis.sort_values('valor_total', ascending=False).head(10)[['frequencia', 'valor_total', 'recencia']].to_dict('index'),
             'rfv_medias': {
@@ -216,7 +553,7 @@ class BusinessAnalyzer:
         --------
         dict: Análise geográfica
         """
-        geo_analysis = self.data.groupby('estado').agg({
+        geo_analysis = self.data.groupby('estado', observed=True, sort=False).agg({
             'valor_total': ['sum', 'mean', 'count'],
             'cliente_id': 'nunique',
             'quantidade': 'sum'
@@ -226,11 +563,13 @@ class BusinessAnalyzer:
         geo_analysis.columns = ['receita_total', 'ticket_medio', 'num_pedidos', 'clientes_unicos', 'qtd_vendida']
         
         # Métricas adicionais
-        geo_analysis['receita_por_cliente'] = (geo_analysis['receita_total'] / geo_analysis['clientes_unicos']).round(2)
-        geo_analysis['pedidos_por_cliente'] = (geo_analysis['num_pedidos'] / geo_analysis['clientes_unicos']).round(2)
-        geo_analysis['participacao_receita'] = (geo_analysis['receita_total'] / geo_analysis['receita_total'].sum() * 100).round(1)
+        geo_analysis['receita_por_cliente'] = geo_analysis['receita_total'] / geo_analysis['clientes_unicos']
+        geo_analysis['pedidos_por_cliente'] = geo_analysis['num_pedidos'] / geo_analysis['clientes_unicos']
+        geo_analysis['participacao_receita'] = geo_analysis['receita_total'] / geo_analysis['receita_total'].sum() * 100
         
-        geo_analysis = geo_analysis.sort_values('receita_total', ascending=False)
+        geo_analysis = geo_analysis.round({
+            'receita_por_cliente': 2, 'pedidos_por_cliente': 2, 'participacao_receita': 1
+        }).sort_values('receita_total', ascending=False)
         
         analysis = {
             'performance_estados': geo_analysis.to_dict('index'),
@@ -240,8 +579,8 @@ class BusinessAnalyzer:
                 'participacao': geo_analysis.iloc[0]['participacao_receita']
             },
             'estado_maior_ticket': {
-                'nome': geo_analysis.sort_values('ticket_medio', ascending=False).index[0],
-                'ticket_medio': geo_analysis.sort_values('ticket_medio', ascending=False).iloc[0]['ticket_medio']
+                'nome': geo_analysis['ticket_medio'].idxmax(),
+                'ticket_medio': geo_analysis['ticket_medio'].max()
             },
             'concentracao_geografica': {
                 'top_3_estados_receita': geo_analysis.head(3)['participacao_receita'].sum(),
@@ -260,7 +599,7 @@ class BusinessAnalyzer:
         --------
         dict: Análise de canais
         """
-        channel_analysis = self.data.groupby('canal_venda').agg({
+        channel_analysis = self.data.groupby('canal_venda', observed=True, sort=False).agg({
             'valor_total': ['sum', 'mean', 'count'],
             'cliente_id': 'nunique',
             'quantidade': 'sum'
@@ -270,27 +609,27 @@ class BusinessAnalyzer:
         channel_analysis.columns = ['receita_total', 'ticket_medio', 'num_pedidos', 'clientes_unicos', 'qtd_vendida']
         
         # Métricas adicionais
-        channel_analysis['participacao_receita'] = (channel_analysis['receita_total'] / channel_analysis['receita_total'].sum() * 100).round(1)
-        channel_analysis['receita_por_cliente'] = (channel_analysis['receita_total'] / channel_analysis['clientes_unicos']).round(2)
-        channel_analysis['conversao_relativa'] = (channel_analysis['num_pedidos'] / channel_analysis['clientes_unicos']).round(2)
+        channel_analysis['participacao_receita'] = channel_analysis['receita_total'] / channel_analysis['receita_total'].sum() * 100
+        channel_analysis['receita_por_cliente'] = channel_analysis['receita_total'] / channel_analysis['clientes_unicos']
+        channel_analysis['conversao_relativa'] = channel_analysis['num_pedidos'] / channel_analysis['clientes_unicos']
         
-        channel_analysis = channel_analysis.sort_values('receita_total', ascending=False)
+        channel_analysis = channel_analysis.round({
+            'participacao_receita': 1, 'receita_por_cliente': 2, 'conversao_relativa': 2
+        }).sort_values('receita_total', ascending=False)
         
         # Análise de crescimento por canal (se temos dados temporais suficientes)
         crescimento_canais = {}
         try:
             # Últimos 2 períodos para comparação
-            data_corte = self.data['data_pedido'].max() - timedelta(days=30)
-            periodo_atual = self.data[self.data['data_pedido'] > data_corte]
-            periodo_anterior = self.data[self.data['data_pedido'] <= data_corte]
+            data_corte = self.date_max - timedelta(days=30)
+            periodo_atual = self.data['data_pedido'].to_numpy() > data_corte.to_datetime64()
+            
+            # Receita por canal em cada período
+            receita_atual = self._bc_sum('canal_venda', 'valor_total', mask=periodo_atual)
+            receita_anterior = self._bc_sum('canal_venda', 'valor_total', mask=~periodo_atual)
             
-            for canal in self.data['canal_venda'].unique():
-                receita_atual = periodo_atual[periodo_atual['canal_venda'] == canal]['valor_total'].sum()
-                receita_anterior = periodo_anterior[periodo_anterior['canal_venda'] == canal]['valor_total'].sum()
-                
-                if receita_anterior > 0:
-                    crescimento = ((receita_atual - receita_anterior) / receita_anterior * 100)
-                    crescimento_canais[canal] = crescimento
+            crescimento = (receita_atual - receita_anterior) / receita_anterior * 100
+            crescimento_canais = crescimento[receita_anterior > 0].to_dict()
         except:
             crescimento_canais = {}
         
@@ -302,8 +641,8 @@ class BusinessAnalyzer:
                 'participacao': channel_analysis.iloc[0]['participacao_receita']
             },
             'canal_maior_ticket': {
-                'nome': channel_analysis.sort_values('ticket_medio', ascending=False).index[0],
-                'ticket_medio': channel_analysis.sort_values('ticket_medio', ascending=False).iloc[0]['ticket_medio']
+                'nome': channel_analysis['ticket_medio'].idxmax(),
+                'ticket_medio': channel_analysis['ticket_medio'].max()
             },
             'crescimento_canais': crescimento_canais,
             'diversificacao': {
@@ -323,31 +662,22 @@ class BusinessAnalyzer:
         --------
         dict: Análise sazonal
         """
+        trimestres, meses, dias_semana = self._date_parts()
+        
         # Análise por trimestre
-        trimestre_analysis = self.data.groupby(self.data['data_pedido'].dt.quarter).agg({
-            'valor_total': ['sum', 'mean', 'count'],
-            'quantidade': 'sum'
-        })
-        trimestre_analysis.columns = ['receita_total', 'ticket_medio', 'num_pedidos', 'qtd_vendida']
+        trimestre_analysis = self._resumo_periodo(trimestres)
         
         # Análise por mês
-        mes_analysis = self.data.groupby(self.data['data_pedido'].dt.month).agg({
-            'valor_total': ['sum', 'mean', 'count'],
-            'quantidade': 'sum'
-        })
-        mes_analysis.columns = ['receita_total', 'ticket_medio', 'num_pedidos', 'qtd_vendida']
+        mes_analysis = self._resumo_periodo(meses)
         
         # Análise por dia da semana
-        dia_analysis = self.data.groupby(self.data['data_pedido'].dt.day_name()).agg({
-            'valor_total': ['sum', 'mean', 'count'],
-            'quantidade': 'sum'
-        })
-        dia_analysis.columns = ['receita_total', 'ticket_medio', 'num_pedidos', 'qtd_vendida']
+        dia_analysis = self._resumo_periodo(dias_semana)
+        dia_analysis.index = [DIAS_SEMANA[int(dia)] for dia in dia_analysis.index]
         
         # Identificar padrões
-        melhor_trimestre = trimestre_analysis.sort_values('receita_total', ascending=False).index[0]
-        melhor_mes = mes_analysis.sort_values('receita_total', ascending=False).index[0]
-        melhor_dia = dia_analysis.sort_values('receita_total', ascending=False).index[0]
+        melhor_trimestre = trimestre_analysis['receita_total'].idxmax()
+        melhor_mes = mes_analysis['receita_total'].idxmax()
+        melhor_dia = dia_analysis['receita_total'].idxmax()
         
         # Coeficiente de variação para medir sazonalidade
         cv_trimestre = trimestre_analysis['receita_total'].std() / trimestre_analysis['receita_total'].mean()
@@ -396,14 +726,10 @@ class BusinessAnalyzer:
         dict: Análise de pricing
         """
         # Análise de elasticidade por categoria (proxy através de dispersão de preços)
-        pricing_analysis = self.data.groupby('categoria').agg({
-            'preco_unitario': ['mean', 'median', 'std', 'min', 'max'],
-            'quantidade': 'sum',
-            'valor_total': 'sum'
-        })
-        
-        # Flatten columns
-        pricing_analysis.columns = ['preco_medio', 'preco_mediano', 'desvio_preco', 'preco_min', 'preco_max', 'qtd_vendida', 'receita_total']
+        # A mediana não se decompõe por produto e é a única métrica lida dos dados brutos
+        pricing_analysis = self._rollup_produto_stats('categoria')
+        pricing_analysis['preco_mediano'] = self.data.groupby('categoria', observed=True, sort=False)['preco_unitario'].median()
+        pricing_analysis = pricing_analysis[['preco_medio', 'preco_mediano', 'desvio_preco', 'preco_min', 'preco_max', 'qtd_vendida', 'receita_total']]
         
         # Coeficiente de variação de preços
         pricing_analysis['cv_preco'] = pricing_analysis['desvio_preco'] / pricing_analysis['preco_medio']
@@ -412,30 +738,27 @@ class BusinessAnalyzer:
         pricing_analysis['margem_potencial'] = ((pricing_analysis['preco_max'] - pricing_analysis['preco_min']) / pricing_analysis['preco_min'] * 100).round(1)
         
         # Análise por produto individual
-        produto_pricing = self.data.groupby('produto').agg({
-            'preco_unitario': ['mean', 'std', 'count'],
-            'quantidade': 'sum'
-        })
-        produto_pricing.columns = ['preco_medio', 'desvio_preco', 'num_transacoes', 'qtd_vendida']
+        produto_pricing = self._rollup_produto_stats('produto').rename(columns={'num_precos': 'num_transacoes'})
+        produto_pricing = produto_pricing[['preco_medio', 'desvio_preco', 'num_transacoes', 'qtd_vendida']]
         produto_pricing['cv_preco'] = produto_pricing['desvio_preco'] / produto_pricing['preco_medio']
         
         # Produtos com oportunidade de ajuste de preço
         produtos_oportunidade = produto_pricing[
             (produto_pricing['cv_preco'] > 0.1) & 
             (produto_pricing['num_transacoes'] >= 5)
-        ].sort_values('cv_preco', ascending=False)
+        ]
         
         analysis = {
             'pricing_por_categoria': pricing_analysis.to_dict('index'),
             'categoria_maior_variacao': {
-                'nome': pricing_analysis.sort_values('cv_preco', ascending=False).index[0],
-                'cv_preco': pricing_analysis.sort_values('cv_preco', ascending=False).iloc[0]['cv_preco']
+                'nome': pricing_analysis['cv_preco'].idxmax(),
+                'cv_preco': pricing_analysis['cv_preco'].max()
             },
             'categoria_maior_margem_potencial': {
-                'nome': pricing_analysis.sort_values('margem_potencial', ascending=False).index[0],
-                'margem_potencial': pricing_analysis.sort_values('margem_potencial', ascending=False).iloc[0]['margem_potencial']
+                'nome': pricing_analysis['margem_potencial'].idxmax(),
+                'margem_potencial': pricing_analysis['margem_potencial'].max()
             },
-            'produtos_oportunidade_pricing': produtos_oportunidade.head(10).to_dict('index'),
+            'produtos_oportunidade_pricing': produtos_oportunidade.nlargest(10, 'cv_preco').to_dict('index'),
             'recomendacoes_pricing': self._generate_pricing_recommendations(pricing_analysis, produtos_oportunidade)
         }
         
@@ -447,11 +770,11 @@ class BusinessAnalyzer:
         recomendacoes = []
         
         # Categoria com maior variação
-        cat_maior_var = pricing_analysis.sort_values('cv_preco', ascending=False).index[0]
+        cat_maior_var = pricing_analysis['cv_preco'].idxmax()
         recomendacoes.append(f"Revisar estratégia de pricing para categoria {cat_maior_var} (alta variação de preços)")
         
         # Categoria com maior potencial
-        cat_maior_pot = pricing_analysis.sort_values('margem_potencial', ascending=False).index[0]
+        cat_maior_pot = pricing_analysis['margem_potencial'].idxmax()
         recomendacoes.append(f"Explorar aumento de preços na categoria {cat_maior_pot} (maior margem potencial)")
         
         if len(produtos_oportunidade) > 0:
@@ -470,15 +793,23 @@ class BusinessAnalyzer:
         """
         print("🔍 Iniciando análise abrangente do negócio...")
         
-        # Executar todas as análises
-        self.calculate_key_metrics()
-        self.analyze_products_performance()
-        self.analyze_categories_performance()
-        self.analyze_customer_behavior()
-        self.analyze_geographic_performance()
-        self.analyze_channel_performance()
-        self.analyze_seasonal_patterns()
-        self.analyze_pricing_opportunities()
+        # Executar todas as análises (independentes entre si) em paralelo;
+        # o pandas/NumPy liberam o GIL na maior parte do trabalho
+        analises = {
+            'metricas_principais': self.calculate_key_metrics,
+            'produtos': self.analyze_products_performance,
+            'categorias': self.analyze_categories_performance,
+            'clientes': self.analyze_customer_behavior,
+            'geografia': self.analyze_geographic_performance,
+            'canais': self.analyze_channel_performance,
+            'sazonalidade': self.analyze_seasonal_patterns,
+            'pricing': self.analyze_pricing_opportunities
+        }
+        with ThreadPoolExecutor(max_workers=min(len(analises), os.cpu_count() or 1)) as executor:
+            resultados = list(executor.map(lambda analise: analise(), analises.values()))
+        
+        # Consolida na thread principal, na ordem fixa das análises
+        self.insights = dict(zip(analises, resultados))
         
         # Gerar insights estratégicos consolidados
         strategic_insights = self._generate_strategic_insights()
@@ -585,64 +916,51 @@ class BusinessAnalyzer:
         file_path : str
             Caminho para salvar o relatório
         """
-        import os
         os.makedirs(os.path.dirname(file_path), exist_ok=True)
         
         if not self.insights:
             self.generate_comprehensive_insights()
         
+        # Monta o relatório em memória e grava de uma vez
+        parts = [
+            "=" * 80 + "\n",
+            "RELATÓRIO COMPLETO DE INSIGHTS DE NEGÓCIO - E-COMMERCE\n",
+            "=" * 80 + "\n",
+            f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n\n"
+        ]
+        
+        # Métricas principais
+        if 'metricas_principais' in self.insights:
+            metrics = self.insights['metricas_principais']
+            parts.append(
+                "📊 MÉTRICAS PRINCIPAIS\n"
+                + "-" * 30 + "\n"
+                f"💰 Receita Total: R$ {metrics['receita_total']:,.2f}\n"
+                f"🎫 Ticket Médio: R$ {metrics['ticket_medio']:.2f}\n"
+                f"📦 Total de Pedidos: {metrics['num_pedidos']:,}\n"
+                f"👥 Clientes Únicos: {metrics['num_clientes']:,}\n"
+                f"🛍️ Produtos Únicos: {metrics['num_produtos']:,}\n"
+                f"📅 Período: {metrics['periodo_dias']} dias\n"
+                f"💵 Receita Diária Média: R$ {metrics['receita_diaria_media']:.2f}\n\n"
+            )
+        
+        # Insights estratégicos
+        if 'estrategicos' in self.insights:
+            estrategicos = self.insights['estrategicos']
+            secoes = [
+                ("💡 PRINCIPAIS DESCOBERTAS", 'principais_descobertas'),
+                ("🚀 OPORTUNIDADES IDENTIFICADAS", 'oportunidades'),
+                ("⚠️ RISCOS IDENTIFICADOS", 'riscos'),
+                ("📋 RECOMENDAÇÕES IMEDIATAS", 'recomendacoes_imediatas'),
+                ("🎯 RECOMENDAÇÕES MÉDIO PRAZO", 'recomendacoes_medio_prazo')
+            ]
+            for titulo, chave in secoes:
+                parts.append(f"{titulo}\n" + "-" * 30 + "\n")
+                parts.extend(f"• {item}\n" for item in estrategicos[chave])
+                parts.append("\n")
+        
         with open(file_path, 'w', encoding='utf-8') as f:
-            f.write("="*80 + "\n")
-            f.write("RELATÓRIO COMPLETO DE INSIGHTS DE NEGÓCIO - E-COMMERCE\n")
-            f.write("="*80 + "\n")
-            f.write(f"Gerado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n\n")
-            
-            # Métricas principais
-            if 'metricas_principais' in self.insights:
-                f.write("📊 MÉTRICAS PRINCIPAIS\n")
-                f.write("-" * 30 + "\n")
-                metrics = self.insights['metricas_principais']
-                f.write(f"💰 Receita Total: R$ {metrics['receita_total']:,.2f}\n")
-                f.write(f"🎫 Ticket Médio: R$ {metrics['ticket_medio']:.2f}\n")
-                f.write(f"📦 Total de Pedidos: {metrics['num_pedidos']:,}\n")
-                f.write(f"👥 Clientes Únicos: {metrics['num_clientes']:,}\n")
-                f.write(f"🛍️ Produtos Únicos: {metrics['num_produtos']:,}\n")
-                f.write(f"📅 Período: {metrics['periodo_dias']} dias\n")
-                f.write(f"💵 Receita Diária Média: R$ {metrics['receita_diaria_media']:.2f}\n\n")
-            
-            # Insights estratégicos
-            if 'estrategicos' in self.insights:
-                estrategicos = self.insights['estrategicos']
-                
-                f.write("💡 PRINCIPAIS DESCOBERTAS\n")
-                f.write("-" * 30 + "\n")
-                for descoberta in estrategicos['principais_descobertas']:
-                    f.write(f"• {descoberta}\n")
-                f.write("\n")
-                
-                f.write("🚀 OPORTUNIDADES IDENTIFICADAS\n")
-                f.write("-" * 30 + "\n")
-                for oportunidade in estrategicos['oportunidades']:
-                    f.write(f"• {oportunidade}\n")
-                f.write("\n")
-                
-                f.write("⚠️ RISCOS IDENTIFICADOS\n")
-                f.write("-" * 30 + "\n")
-                for risco in estrategicos['riscos']:
-                    f.write(f"• {risco}\n")
-                f.write("\n")
-                
-                f.write("📋 RECOMENDAÇÕES IMEDIATAS\n")
-                f.write("-" * 30 + "\n")
-                for rec in estrategicos['recomendacoes_imediatas']:
-                    f.write(f"• {rec}\n")
-                f.write("\n")
-                
-                f.write("🎯 RECOMENDAÇÕES MÉDIO PRAZO\n")
-                f.write("-" * 30 + "\n")
-                for rec in estrategicos['recomendacoes_medio_prazo']:
-                    f.write(f"• {rec}\n")
-                f.write("\n")
+            f.write(''.join(parts))
         
         print(f"✅ Relatório de insights exportado para: {file_path}")
 
@@ -1,13 +1,20 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
+import numpy as np
 import plotly.graph_objects as go
 from datetime import datetime
+from io import BytesIO
+import hashlib
 import sys
 import os
 
+try:
+    import polars as pl
+except ImportError:  # Polars é opcional; sem ele as agregações usam pandas
+    pl = None
+
 # Importar módulos do projeto
-from data_processing import DataProcessor, generate_sample_data
+from data_processing import DataProcessor, generate_sample_data, to_excel_bytes
 from business_analysis import BusinessAnalyzer
 
 # Configuração da página
@@ -31,28 +38,222 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Formatação das tabelas de métricas feita no front-end (sem Styler no Python)
+METRIC_TABLE_CONFIG = {
+    'receita_total': st.column_config.NumberColumn('receita_total', format='R$ %.2f'),
+    'ticket_medio': st.column_config.NumberColumn('ticket_medio', format='R$ %.2f'),
+    'num_pedidos': st.column_config.NumberColumn('num_pedidos', format='%d'),
+    'participacao_receita': st.column_config.NumberColumn('participacao_receita', format='%.1f%%')
+}
+
 # Cache para dados processados
 @st.cache_data
-def load_and_process_data(file_path=None, use_sample=True, n_samples=5000):
-    """Carrega e processa dados com cache"""
+def load_and_process_data(file_path=None, use_sample=True, n_samples=5000, file_bytes=None, file_name=None, file_mtime=None):
+    """
+    Carrega e processa dados com cache
+    
+    file_bytes/file_name trazem o conteúdo de um upload, lido da memória;
+    file_mtime só entra na chave do cache, para recarregar arquivos alterados.
+    """
     processor = DataProcessor()
     
-    if file_path:
+    if file_bytes is not None:
+        arquivo = BytesIO(file_bytes)
+        arquivo.name = file_name
+        processor.load_data(file_path=arquivo)
+    elif file_path:
         processor.load_data(file_path=file_path)
     elif use_sample:
         sample_data = generate_sample_data(n_samples)
         processor.load_data(data=sample_data)
     
     processed_data = processor.clean_data(remove_outliers=True)
-    return processed_data, processor
+    
+    # Chaves de agrupamento como category e quantidades em inteiros estreitos;
+    # valores monetários continuam float64 para não perder centavos nos totais
+    for col in ('categoria', 'canal_venda', 'estado', 'produto'):
+        if col in processed_data.columns:
+            processed_data[col] = processed_data[col].astype('category')
+    if 'quantidade' in processed_data.columns and pd.api.types.is_integer_dtype(processed_data['quantidade']):
+        processed_data['quantidade'] = pd.to_numeric(processed_data['quantidade'], downcast='integer')
+    
+    # Opções dos filtros, calculadas uma vez junto com os dados em cache
+    facets = {
+        col: processed_data[col].cat.categories.tolist()
+        for col in ('categoria', 'canal_venda', 'estado') if col in processed_data.columns
+    }
+    if 'data_pedido' in processed_data.columns:
+        facets['data_pedido'] = (processed_data['data_pedido'].min(), processed_data['data_pedido'].max())
+    
+    # Assinatura dos dados (formato, tipos e hash de todo o conteúdo, na ordem das
+    # linhas), calculada uma vez por carga; entra nas chaves dos caches seguintes no
+    # lugar do DataFrame. Qualquer mudança no conteúdo (mesmo nome de arquivo e mesmo
+    # número de linhas) gera outra assinatura, sem reaproveitar insights ou downloads
+    hashes_linhas = pd.util.hash_pandas_object(processed_data, index=False).to_numpy()
+    assinatura = (
+        processed_data.shape,
+        tuple(processed_data.dtypes.astype(str)),
+        hashlib.blake2b(hashes_linhas.tobytes(), digest_size=16).hexdigest()
+    )
+    return processed_data, processor, facets, assinatura
 
-@st.cache_data
-def analyze_business(_data):
-    """Análise de negócio com cache"""
+@st.cache_resource
+def analyze_business(_data, cache_key):
+    """
+    Análise de negócio com cache por fonte de dados e filtros (cache_key)
+    
+    O DataFrame não entra no hash; o analisador é reaproveitado sem cópia entre reruns.
+    """
     analyzer = BusinessAnalyzer(_data)
     insights = analyzer.generate_comprehensive_insights()
     return insights, analyzer
 
+@st.cache_data
+def aggregate_revenue(_df, cache_key):
+    """
+    Receita mensal, por categoria e por canal para a visão geral, em cache
+    por fonte de dados e filtros (cache_key)
+    
+    Categoria e canal saem de uma única agregação cruzada (categoria x canal),
+    da qual cada visão é um rollup. Com Polars instalado, as agregações são
+    planos lazy sobre uma única cópia colunar dos dados, executados juntos
+    por collect_all.
+    
+    Returns:
+    --------
+    dict: DataFrames pandas ('mensal', 'categoria', 'canal_venda'), só para as colunas presentes
+    """
+    df = _df
+    chaves = [col for col in ('categoria', 'canal_venda') if col in df.columns]
+    tem_data = 'data_pedido' in df.columns
+    
+    if pl is not None:
+        colunas = chaves + ['valor_total'] + (['data_pedido'] if tem_data else [])
+        base = pl.from_pandas(df[colunas]).lazy()
+        # Um único group_by sobre todas as chaves; cada visão é um rollup do cruzamento
+        cruzado = base.group_by(chaves, maintain_order=True).agg(pl.col('valor_total').sum())
+        planos = {
+            chave: cruzado.drop_nulls(chave).group_by(chave, maintain_order=True).agg(pl.col('valor_total').sum())
+            for chave in chaves
+        }
+        if tem_data:
+            planos['mensal'] = (
+                base.drop_nulls('data_pedido')
+                .group_by(pl.col('data_pedido').dt.truncate('1mo'))
+                .agg(pl.col('valor_total').sum())
+                .sort('data_pedido')
+            )
+        resultados = pl.collect_all(list(planos.values()))
+        return {nome: resultado.to_pandas() for nome, resultado in zip(planos, resultados)}
+    
+    agregados = {}
+    if chaves:
+        # Fatoração das chaves feita uma vez; os rollups operam sobre poucos grupos
+        cruzado = df.groupby(chaves, observed=True, sort=False, dropna=False)['valor_total'].sum()
+        agregados = {
+            chave: cruzado.groupby(level=chave, observed=True, sort=False).sum().reset_index()
+            for chave in chaves
+        }
+    if tem_data:
+        agregados['mensal'] = monthly_revenue(df)
+    return agregados
+
+def pie_chart(labels, values, title):
+    """Gráfico de pizza montado direto de arrays já agregados"""
+    fig = go.Figure(go.Pie(labels=labels, values=values))
+    fig.update_layout(title=title, uirevision='keep')
+    return fig
+
+def bar_chart(x, y, title, x_title, y_title, color=None, orientation='v', hover_names=None):
+    """
+    Gráfico de barras montado direto de arrays já agregados
+    
+    Parameters:
+    -----------
+    hover_names : array-like, optional
+        Nomes completos exibidos no hover (quando os rótulos do eixo são truncados)
+    """
+    bar = go.Bar(x=x, y=y, orientation=orientation, marker_color=color)
+    if hover_names is not None:
+        valor = '%{x:,}' if orientation == 'h' else '%{y:,}'
+        bar.update(customdata=hover_names, hovertemplate=f'%{{customdata}}: {valor}<extra></extra>')
+    fig = go.Figure(bar)
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title, uirevision='keep')
+    return fig
+
+def truncate_label(nome, limite=30):
+    """Trunca nomes longos para rótulos de eixo"""
+    return nome[:limite] + '...' if len(nome) > limite else nome
+
+@st.cache_data
+def to_csv_bytes(_df, cache_key):
+    """CSV dos dados filtrados, serializado uma vez por fonte de dados e filtros"""
+    return _df.to_csv(index=False).encode('utf-8')
+
+@st.cache_data
+def to_xlsx_bytes(_df, cache_key):
+    """Excel dos dados filtrados, serializado uma vez por fonte de dados e filtros"""
+    return to_excel_bytes(_df, sheet_name='Dados')
+
+def lttb_indices(x, y, n_out=1000):
+    """
+    Índices dos pontos mantidos pelo Largest-Triangle-Three-Buckets
+    
+    Preserva o formato visual da série enviando no máximo n_out pontos ao
+    navegador; séries menores que n_out são mantidas inteiras.
+    
+    Parameters:
+    -----------
+    x : np.ndarray
+        Eixo x numérico ou datetime64 (ordenado)
+    y : np.ndarray
+        Valores da série
+    n_out : int
+        Número máximo de pontos exibidos
+    """
+    n = len(y)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    
+    x = x.astype(np.float64) if x.dtype.kind != 'M' else x.view(np.int64).astype(np.float64)
+    y = y.astype(np.float64)
+    passo = (n - 2) / (n_out - 2)
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        # Média do próximo bucket (terceiro vértice do triângulo)
+        prox_ini = int((i + 1) * passo) + 1
+        prox_fim = min(int((i + 2) * passo) + 1, n)
+        media_x = x[prox_ini:prox_fim].mean()
+        media_y = y[prox_ini:prox_fim].mean()
+        
+        ini = int(i * passo) + 1
+        fim = int((i + 1) * passo) + 1
+        areas = np.abs(
+            (x[a] - media_x) * (y[ini:fim] - y[a]) - (x[a] - x[ini:fim]) * (media_y - y[a])
+        )
+        a = ini + int(areas.argmax())
+        indices[i + 1] = a
+    return indices
+
+def monthly_revenue(df):
+    """Receita por mês via chaves datetime64[M] e np.bincount (sem objetos Period)"""
+    meses = df['data_pedido'].to_numpy().astype('datetime64[M]')
+    validos = ~np.isnat(meses)
+    chaves = meses[validos].view(np.int64)  # meses desde 1970-01
+    if len(chaves) == 0:
+        return pd.DataFrame({'data_pedido': pd.to_datetime([]), 'valor_total': []})
+    
+    primeiro = chaves.min()
+    pedidos = np.bincount(chaves - primeiro)
+    receita = np.bincount(chaves - primeiro, weights=df['valor_total'].to_numpy(dtype=np.float64)[validos])
+    presentes = np.flatnonzero(pedidos)
+    return pd.DataFrame({
+        'data_pedido': (presentes + primeiro).astype('datetime64[M]').astype('datetime64[ns]'),
+        'valor_total': receita[presentes]
+    })
+
 # Cabeçalho
 st.markdown('<div class="main-header">📊 Dashboard de Análise de Vendas E-commerce</div>', unsafe_allow_html=True)
 st.markdown("---")
@@ -77,8 +278,8 @@ with st.sidebar:
         
     elif data_source == "Upload de Arquivo":
         uploaded_file = st.file_uploader(
-            "Upload CSV ou Excel:",
-            type=['csv', 'xlsx', 'xls']
+            "Upload CSV, Excel ou Parquet:",
+            type=['csv', 'xlsx', 'xls', 'parquet']
         )
         
     elif data_source == "Arquivo Existente":
@@ -86,7 +287,7 @@ with st.sidebar:
         file_options = []
         for folder in ['data/processed', 'data/sample', 'data/raw']:
             if os.path.exists(folder):
-                files = [f for f in os.listdir(folder) if f.endswith(('.csv', '.xlsx', '.xls'))]
+                files = [f for f in os.listdir(folder) if f.endswith(('.csv', '.xlsx', '.xls', '.parquet'))]
                 file_options.extend([os.path.join(folder, f) for f in files])
         
         if file_options:
@@ -103,53 +304,70 @@ with st.sidebar:
 # Carregar dados
 try:
     if data_source == "Upload de Arquivo" and uploaded_file is not None:
-        # Salvar temporariamente
-        temp_path = f"data/temp_{uploaded_file.name}"
-        with open(temp_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-        data, processor = load_and_process_data(file_path=temp_path, use_sample=False)
-        os.remove(temp_path)
+        # Lido direto da memória, sem arquivo temporário
+        data, processor, facets, assinatura = load_and_process_data(
+            use_sample=False,
+            file_bytes=uploaded_file.getvalue(),
+            file_name=uploaded_file.name
+        )
+        data_key = ('upload', uploaded_file.name, assinatura)
         
     elif data_source == "Arquivo Existente" and existing_file:
-        data, processor = load_and_process_data(file_path=existing_file, use_sample=False)
+        file_mtime = os.path.getmtime(existing_file)
+        data, processor, facets, assinatura = load_and_process_data(file_path=existing_file, use_sample=False, file_mtime=file_mtime)
+        data_key = ('arquivo', existing_file, file_mtime, assinatura)
         
     else:  # Dados simulados
-        data, processor = load_and_process_data(use_sample=True, n_samples=n_samples)
+        data, processor, facets, assinatura = load_and_process_data(use_sample=True, n_samples=n_samples)
+        data_key = ('simulado', n_samples, assinatura)
     
-    # Aplicar filtros se necessário
-    filtered_data = data.copy()
+    # Aplicar filtros se necessário: uma única máscara booleana, sem copiar os dados
+    # (os filtros escolhidos compõem a chave dos caches)
+    mask = np.ones(len(data), dtype=bool)
+    filter_key = []
     
     if apply_filters:
         with st.sidebar:
-            if 'categoria' in data.columns:
+            if 'categoria' in facets:
                 categorias = st.multiselect(
                     "Categorias:",
-                    options=data['categoria'].unique(),
-                    default=data['categoria'].unique()
+                    options=facets['categoria'],
+                    default=facets['categoria']
                 )
-                filtered_data = filtered_data[filtered_data['categoria'].isin(categorias)]
+                # Com todas as opções marcadas não há filtro: evita o isin e a máscara
+                if set(categorias) != set(facets['categoria']):
+                    mask &= data['categoria'].isin(categorias).to_numpy()
+                    filter_key.append(('categoria', tuple(categorias)))
             
-            if 'canal_venda' in data.columns:
+            if 'canal_venda' in facets:
                 canais = st.multiselect(
                     "Canais:",
-                    options=data['canal_venda'].unique(),
-                    default=data['canal_venda'].unique()
+                    options=facets['canal_venda'],
+                    default=facets['canal_venda']
                 )
-                filtered_data = filtered_data[filtered_data['canal_venda'].isin(canais)]
+                if set(canais) != set(facets['canal_venda']):
+                    mask &= data['canal_venda'].isin(canais).to_numpy()
+                    filter_key.append(('canal_venda', tuple(canais)))
             
-            if 'data_pedido' in data.columns:
+            if 'data_pedido' in facets:
                 date_range = st.date_input(
                     "Período:",
-                    value=(data['data_pedido'].min(), data['data_pedido'].max())
+                    value=facets['data_pedido']
                 )
                 if len(date_range) == 2:
-                    filtered_data = filtered_data[
-                        (filtered_data['data_pedido'] >= pd.to_datetime(date_range[0])) &
-                        (filtered_data['data_pedido'] <= pd.to_datetime(date_range[1]))
-                    ]
+                    # Comparação vetorizada no array datetime64, na unidade da própria coluna
+                    datas = data['data_pedido'].to_numpy()
+                    inicio, fim = (np.datetime64(d, 'D').astype(datas.dtype) for d in date_range)
+                    data_min, data_max = (np.datetime64(d).astype(datas.dtype) for d in facets['data_pedido'])
+                    if inicio > data_min or fim < data_max:
+                        mask &= (datas >= inicio) & (datas <= fim)
+                        filter_key.append(('data_pedido', tuple(date_range)))
+    
+    filtered_data = data if mask.all() else data[mask]
     
     # Análise de negócio
-    insights, analyzer = analyze_business(filtered_data)
+    cache_key = (data_key, tuple(filter_key))
+    insights, analyzer = analyze_business(filtered_data, cache_key)
     
     # KPIs Principais
     st.header("📈 Métricas Principais")
@@ -187,34 +405,41 @@ try:
     
     st.markdown("---")
     
-    # Tabs para diferentes análises
-    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs([
-        "📊 Visão Geral",
-        "🏆 Produtos",
-        "📂 Categorias",
-        "🗺️ Geografia",
-        "📱 Canais",
-        "👥 Clientes"
-    ])
-    
-    with tab1:
+    # Seletor de análise: só a aba ativa é calculada e renderizada a cada rerun
+    aba_ativa = st.radio(
+        "Análise:",
+        [
+            "📊 Visão Geral",
+            "🏆 Produtos",
+            "📂 Categorias",
+            "🗺️ Geografia",
+            "📱 Canais",
+            "👥 Clientes"
+        ],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="aba_ativa"
+    )
+    
+    if aba_ativa == "📊 Visão Geral":
         st.subheader("Evolução da Receita")
+        receita_agregada = aggregate_revenue(filtered_data, cache_key)
         
         # Gráfico de evolução mensal
-        if 'data_pedido' in filtered_data.columns:
-            vendas_mensais = filtered_data.groupby(
-                filtered_data['data_pedido'].dt.to_period('M')
-            )['valor_total'].sum().reset_index()
-            vendas_mensais['data_pedido'] = vendas_mensais['data_pedido'].astype(str)
+        if 'mensal' in receita_agregada:
+            vendas_mensais = receita_agregada['mensal']
             
-            fig = px.line(
-                vendas_mensais,
-                x='data_pedido',
-                y='valor_total',
-                title='Receita Mensal',
-                labels={'valor_total': 'Receita (R$)', 'data_pedido': 'Mês'}
-            )
-            fig.update_traces(line_color='#2E86AB', line_width=3)
+            x = vendas_mensais['data_pedido'].to_numpy()
+            y = vendas_mensais['valor_total'].to_numpy()
+            pontos = lttb_indices(x, y)
+            
+            fig = go.Figure(go.Scatter(
+                x=x[pontos],
+                y=y[pontos],
+                mode='lines',
+                line=dict(color='#2E86AB', width=3)
+            ))
+            fig.update_layout(title='Receita Mensal', xaxis_title='Mês', yaxis_title='Receita (R$)', uirevision='keep')
             st.plotly_chart(fig, use_container_width=True)
         
         # Duas colunas para gráficos adicionais
@@ -222,26 +447,16 @@ try:
         
         with col1:
             st.subheader("Distribuição por Categoria")
-            if 'categoria' in filtered_data.columns:
-                cat_data = filtered_data.groupby('categoria')['valor_total'].sum().reset_index()
-                fig = px.pie(
-                    cat_data,
-                    values='valor_total',
-                    names='categoria',
-                    title='Receita por Categoria'
-                )
+            if 'categoria' in receita_agregada:
+                cat_data = receita_agregada['categoria']
+                fig = pie_chart(cat_data['categoria'].to_numpy(), cat_data['valor_total'].to_numpy(), 'Receita por Categoria')
                 st.plotly_chart(fig, use_container_width=True)
         
         with col2:
             st.subheader("Distribuição por Canal")
-            if 'canal_venda' in filtered_data.columns:
-                canal_data = filtered_data.groupby('canal_venda')['valor_total'].sum().reset_index()
-                fig = px.pie(
-                    canal_data,
-                    values='valor_total',
-                    names='canal_venda',
-                    title='Receita por Canal'
-                )
+            if 'canal_venda' in receita_agregada:
+                canal_data = receita_agregada['canal_venda']
+                fig = pie_chart(canal_data['canal_venda'].to_numpy(), canal_data['valor_total'].to_numpy(), 'Receita por Canal')
                 fig.update_layout(
                     height=400,
                     showlegend=True,
@@ -255,7 +470,7 @@ try:
                 )
                 st.plotly_chart(fig, use_container_width=True)
     
-    with tab2:
+    elif aba_ativa == "🏆 Produtos":
         st.subheader("🏆 Análise de Produtos")
         
         produtos_insights = insights.get('produtos', {})
@@ -267,58 +482,38 @@ try:
             st.markdown("**Top 10 Produtos por Receita**")
             top_receita = produtos_insights.get('top_10_receita', {})
             if top_receita:
-                df_top = pd.DataFrame(list(top_receita.items()), columns=['Produto', 'Receita'])
-                df_top = df_top.sort_values('Receita', ascending=False).head(10)
-                
-                # Truncar nomes longos
-                df_top['Produto_Display'] = df_top['Produto'].apply(
-                    lambda x: x[:30] + '...' if len(x) > 30 else x
-                )
-                
-                fig = px.bar(
-                    df_top,
-                    y='Produto_Display',
-                    x='Receita',
-                    orientation='h',
+                # Os insights já vêm ordenados do maior para o menor
+                produtos = list(top_receita)[:10]
+                fig = bar_chart(
+                    x=list(top_receita.values())[:10],
+                    y=[truncate_label(produto) for produto in produtos],
                     title='Top 10 Produtos',
-                    hover_data={'Produto': True, 'Produto_Display': False}
-                )
-                fig.update_traces(marker_color='#2E86AB')
-                fig.update_layout(
-                    height=500,
-                    margin=dict(l=200, r=20, t=40, b=40),
-                    yaxis_title="",
-                    xaxis_title="Receita (R$)"
+                    x_title="Receita (R$)",
+                    y_title="",
+                    color='#2E86AB',
+                    orientation='h',
+                    hover_names=produtos
                 )
+                fig.update_layout(height=500, margin=dict(l=200, r=20, t=40, b=40))
                 st.plotly_chart(fig, use_container_width=True)
         
         with col2:
             st.markdown("**Top 10 Produtos por Quantidade**")
             top_qtd = produtos_insights.get('top_10_quantidade', {})
             if top_qtd:
-                df_top_qtd = pd.DataFrame(list(top_qtd.items()), columns=['Produto', 'Quantidade'])
-                df_top_qtd = df_top_qtd.sort_values('Quantidade', ascending=False).head(10)
-                
-                # Truncar nomes longos
-                df_top_qtd['Produto_Display'] = df_top_qtd['Produto'].apply(
-                    lambda x: x[:30] + '...' if len(x) > 30 else x
-                )
-                
-                fig = px.bar(
-                    df_top_qtd,
-                    y='Produto_Display',
-                    x='Quantidade',
-                    orientation='h',
+                # Os insights já vêm ordenados do maior para o menor
+                produtos = list(top_qtd)[:10]
+                fig = bar_chart(
+                    x=list(top_qtd.values())[:10],
+                    y=[truncate_label(produto) for produto in produtos],
                     title='Top 10 por Volume',
-                    hover_data={'Produto': True, 'Produto_Display': False}
-                )
-                fig.update_traces(marker_color='#A23B72')
-                fig.update_layout(
-                    height=500,
-                    margin=dict(l=200, r=20, t=40, b=40),
-                    yaxis_title="",
-                    xaxis_title="Quantidade"
+                    x_title="Quantidade",
+                    y_title="",
+                    color='#A23B72',
+                    orientation='h',
+                    hover_names=produtos
                 )
+                fig.update_layout(height=500, margin=dict(l=200, r=20, t=40, b=40))
                 st.plotly_chart(fig, use_container_width=True)
         
         # Produto destaque
@@ -333,58 +528,48 @@ try:
 • Participação: {destaque.get('participacao_receita', 0):.1f}% da receita total
             """)
     
-    with tab3:
+    elif aba_ativa == "📂 Categorias":
         st.subheader("📂 Análise de Categorias")
         
         cat_insights = insights.get('categorias', {})
         resumo_cat = cat_insights.get('resumo_categorias', {})
         
         if resumo_cat:
-            df_cat = pd.DataFrame(resumo_cat).T
+            df_cat = pd.DataFrame.from_dict(resumo_cat, orient='index')
             df_cat = df_cat.sort_values('receita_total', ascending=False)
             
             # Gráfico de barras
-            fig = px.bar(
-                df_cat.reset_index(),
-                x='index',
-                y='receita_total',
-                title='Receita por Categoria',
-                labels={'index': 'Categoria', 'receita_total': 'Receita (R$)'}
+            fig = bar_chart(
+                df_cat.index.to_numpy(), df_cat['receita_total'].to_numpy(),
+                'Receita por Categoria', 'Categoria', 'Receita (R$)', color='#F18F01'
             )
-            fig.update_traces(marker_color='#F18F01')
             st.plotly_chart(fig, use_container_width=True)
             
             # Tabela detalhada
             st.markdown("**Detalhamento por Categoria**")
             st.dataframe(
-                df_cat[['receita_total', 'ticket_medio', 'num_pedidos', 'participacao_receita']].style.format({
-                    'receita_total': 'R$ {:,.2f}',
-                    'ticket_medio': 'R$ {:,.2f}',
-                    'num_pedidos': '{:,.0f}',
-                    'participacao_receita': '{:.1f}%'
-                }),
+                df_cat[list(METRIC_TABLE_CONFIG)],
+                column_config=METRIC_TABLE_CONFIG,
                 use_container_width=True
             )
     
-    with tab4:
+    elif aba_ativa == "🗺️ Geografia":
         st.subheader("🗺️ Análise Geográfica")
         
         geo_insights = insights.get('geografia', {})
         performance_estados = geo_insights.get('performance_estados', {})
         
         if performance_estados:
-            df_geo = pd.DataFrame(performance_estados).T
+            df_geo = pd.DataFrame.from_dict(performance_estados, orient='index')
             df_geo = df_geo.sort_values('receita_total', ascending=False)
             
             # Mapa de receita por estado
-            fig = px.bar(
-                df_geo.reset_index().head(10),
-                x='index',
-                y='receita_total',
-                title='Top 10 Estados por Receita',
-                labels={'index': 'Estado', 'receita_total': 'Receita (R$)'}
+            top_estados = df_geo.head(10)
+            estados = top_estados.index.to_numpy()
+            fig = bar_chart(
+                estados, top_estados['receita_total'].to_numpy(),
+                'Top 10 Estados por Receita', 'Estado', 'Receita (R$)', color='#C73E1D'
             )
-            fig.update_traces(marker_color='#C73E1D')
             fig.update_layout(
                 height=400,
                 xaxis_tickangle=-45
@@ -395,70 +580,55 @@ try:
             col1, col2 = st.columns(2)
             
             with col1:
-                fig = px.bar(
-                    df_geo.reset_index().head(10),
-                    x='index',
-                    y='ticket_medio',
-                    title='Ticket Médio por Estado',
-                    labels={'index': 'Estado', 'ticket_medio': 'Ticket Médio (R$)'}
+                fig = bar_chart(
+                    estados, top_estados['ticket_medio'].to_numpy(),
+                    'Ticket Médio por Estado', 'Estado', 'Ticket Médio (R$)'
                 )
                 fig.update_layout(xaxis_tickangle=-45, height=400)
                 st.plotly_chart(fig, use_container_width=True)
             
             with col2:
-                fig = px.bar(
-                    df_geo.reset_index().head(10),
-                    x='index',
-                    y='clientes_unicos',
-                    title='Clientes Únicos por Estado',
-                    labels={'index': 'Estado', 'clientes_unicos': 'Clientes'}
+                fig = bar_chart(
+                    estados, top_estados['clientes_unicos'].to_numpy(),
+                    'Clientes Únicos por Estado', 'Estado', 'Clientes'
                 )
                 fig.update_layout(xaxis_tickangle=-45, height=400)
                 st.plotly_chart(fig, use_container_width=True)
     
-    with tab5:
+    elif aba_ativa == "📱 Canais":
         st.subheader("📱 Análise de Canais")
         
         canais_insights = insights.get('canais', {})
         performance_canais = canais_insights.get('performance_canais', {})
         
         if performance_canais:
-            df_canais = pd.DataFrame(performance_canais).T
+            df_canais = pd.DataFrame.from_dict(performance_canais, orient='index')
             
             col1, col2 = st.columns(2)
             
             with col1:
-                fig = px.pie(
-                    df_canais.reset_index(),
-                    values='receita_total',
-                    names='index',
-                    title='Distribuição de Receita por Canal'
+                fig = pie_chart(
+                    df_canais.index.to_numpy(), df_canais['receita_total'].to_numpy(),
+                    'Distribuição de Receita por Canal'
                 )
                 st.plotly_chart(fig, use_container_width=True)
             
             with col2:
-                fig = px.bar(
-                    df_canais.reset_index(),
-                    x='index',
-                    y='ticket_medio',
-                    title='Ticket Médio por Canal',
-                    labels={'index': 'Canal', 'ticket_medio': 'Ticket Médio (R$)'}
+                fig = bar_chart(
+                    df_canais.index.to_numpy(), df_canais['ticket_medio'].to_numpy(),
+                    'Ticket Médio por Canal', 'Canal', 'Ticket Médio (R$)'
                 )
                 st.plotly_chart(fig, use_container_width=True)
             
             # Tabela de performance
             st.markdown("**Performance Detalhada por Canal**")
             st.dataframe(
-                df_canais[['receita_total', 'ticket_medio', 'num_pedidos', 'participacao_receita']].style.format({
-                    'receita_total': 'R$ {:,.2f}',
-                    'ticket_medio': 'R$ {:,.2f}',
-                    'num_pedidos': '{:,.0f}',
-                    'participacao_receita': '{:.1f}%'
-                }),
+                df_canais[list(METRIC_TABLE_CONFIG)],
+                column_config=METRIC_TABLE_CONFIG,
                 use_container_width=True
             )
     
-    with tab6:
+    elif aba_ativa == "👥 Clientes":
         st.subheader("👥 Análise de Clientes")
         
         clientes_insights = insights.get('clientes', {})
@@ -487,27 +657,22 @@ try:
         # Segmentação RFV
         segmentacao = clientes_insights.get('segmentacao', {})
         if segmentacao:
-            df_seg = pd.DataFrame(segmentacao).T
+            df_seg = pd.DataFrame.from_dict(segmentacao, orient='index')
             df_seg = df_seg.sort_values('num_clientes', ascending=False)
             
             col1, col2 = st.columns(2)
             
             with col1:
-                fig = px.pie(
-                    df_seg.reset_index(),
-                    values='num_clientes',
-                    names='index',
-                    title='Distribuição de Clientes por Segmento'
+                fig = pie_chart(
+                    df_seg.index.to_numpy(), df_seg['num_clientes'].to_numpy(),
+                    'Distribuição de Clientes por Segmento'
                 )
                 st.plotly_chart(fig, use_container_width=True)
             
             with col2:
-                fig = px.bar(
-                    df_seg.reset_index(),
-                    x='index',
-                    y='valor_medio',
-                    title='Valor Médio por Segmento',
-                    labels={'index': 'Segmento', 'valor_medio': 'Valor Médio (R$)'}
+                fig = bar_chart(
+                    df_seg.index.to_numpy(), df_seg['valor_medio'].to_numpy(),
+                    'Valor Médio por Segmento', 'Segmento', 'Valor Médio (R$)'
                 )
                 st.plotly_chart(fig, use_container_width=True)
     
@@ -547,35 +712,26 @@ try:
     
     col1, col2, col3 = st.columns(3)
     
+    # Arquivos serializados em cache: reruns não regeram CSV/Excel
     with col1:
-        if st.button("💾 Exportar CSV"):
-            csv = filtered_data.to_csv(index=False)
-            st.download_button(
-                "Download CSV",
-                csv,
-                "dados_processados.csv",
-                "text/csv"
-            )
+        st.download_button(
+            "💾 Download CSV",
+            to_csv_bytes(filtered_data, cache_key),
+            "dados_processados.csv",
+            "text/csv"
+        )
     
     with col2:
-        if st.button("📊 Exportar Excel"):
-            # Criar arquivo Excel em memória
-            from io import BytesIO
-            buffer = BytesIO()
-            with pd.ExcelWriter(buffer, engine='openpyxl') as writer:
-                filtered_data.to_excel(writer, sheet_name='Dados', index=False)
-            
-            st.download_button(
-                "Download Excel",
-                buffer.getvalue(),
-                "dados_processados.xlsx",
-                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+        st.download_button(
+            "📊 Download Excel",
+            to_xlsx_bytes(filtered_data, cache_key),
+            "dados_processados.xlsx",
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
     
     with col3:
-        if st.button("📄 Exportar Relatório"):
-            # Gerar relatório em texto
-            report = f"""
+        # Gerar relatório em texto
+        report = f"""
 RELATÓRIO DE ANÁLISE - {datetime.now().strftime('%d/%m/%Y')}
 
 MÉTRICAS PRINCIPAIS:
@@ -590,12 +746,12 @@ PRINCIPAIS DESCOBERTAS:
 RECOMENDAÇÕES:
 {chr(10).join(['- ' + r for r in recomendacoes])}
 """
-            st.download_button(
-                "Download Relatório",
-                report,
-                "relatorio_analise.txt",
-                "text/plain"
-            )
+        st.download_button(
+            "📄 Download Relatório",
+            report,
+            "relatorio_analise.txt",
+            "text/plain"
+        )
 
 except Exception as e:
     st.error(f"❌ Erro ao processar dados: {str(e)}")
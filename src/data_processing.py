@@ -1,8 +1,191 @@
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-import warnings
-warnings.filterwarnings('ignore')
+from datetime import datetime
+from io import BytesIO
+
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = 'pyarrow'  # leitor multithread do Arrow
+except ImportError:  # pyarrow é opcional
+    CSV_ENGINE = 'c'
+
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = 'calamine'  # leitor de Excel em Rust, bem mais rápido que o openpyxl
+except ImportError:  # python-calamine é opcional
+    EXCEL_ENGINE = None
+
+try:
+    import polars as pl
+except ImportError:  # Polars é opcional; sem ele clean_data usa apenas pandas
+    pl = None
+
+try:
+    import xlsxwriter  # noqa: F401
+    XLSX_ENGINE = 'xlsxwriter'  # gravador de Excel mais rápido que o openpyxl
+except ImportError:  # sem xlsxwriter o Excel é gerado pelo openpyxl
+    XLSX_ENGINE = 'openpyxl'
+
+# Colunas que não podem ser nulas nem negativas/zero
+CRITICAL_COLUMNS = ['valor_total', 'preco_unitario', 'quantidade']
+
+# Chaves que identificam uma linha de pedido na remoção de duplicatas; um
+# pedido com vários itens repete pedido_id, por isso o produto entra na chave
+DEDUP_KEY_COLUMNS = ('pedido_id', 'produto')
+DEDUP_FALLBACK_COLUMNS = ('data_pedido', 'cliente_id', 'produto')
+
+# Colunas de texto convertidas para category quando a cardinalidade é baixa
+CATEGORY_COLUMNS = ('produto', 'categoria', 'estado', 'canal_venda')
+LIMITE_CARDINALIDADE_CATEGORY = 0.5
+
+# Nomes em inglês, iguais aos de strftime('%B') e day_name()
+NOMES_MESES = np.array(['January', 'February', 'March', 'April', 'May', 'June', 'July',
+                        'August', 'September', 'October', 'November', 'December'], dtype=object)
+NOMES_DIAS_SEMANA = np.array(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday',
+                              'Saturday', 'Sunday'], dtype=object)
+
+def extract_date_parts(datas):
+    """
+    Extrai ano, mês, trimestre, dia da semana e semana ISO de um array datetime64
+    
+    Tudo sai de aritmética inteira sobre o próprio buffer datetime64, sem
+    passar pelo acessor .dt nem formatar strings por linha.
+    
+    Parameters:
+    -----------
+    datas : np.ndarray
+        Array datetime64 (qualquer unidade); NaT é permitido
+        
+    Returns:
+    --------
+    dict: Arrays 'ano', 'mes', 'trimestre', 'dia_semana' (0=segunda) e 'semana_ano'
+    """
+    dias = datas.astype('datetime64[D]')
+    dia_semana = (dias.view(np.int64) + 3) % 7  # 1970-01-01 foi uma quinta-feira
+    mes = datas.astype('datetime64[M]').view(np.int64) % 12 + 1
+    
+    # Semana ISO: a quinta-feira da semana define o ano ISO
+    quinta = dias + (3 - dia_semana).astype('timedelta64[D]')
+    inicio_ano_iso = quinta.astype('datetime64[Y]').astype('datetime64[D]')
+    semana = (quinta - inicio_ano_iso).view(np.int64) // 7 + 1
+    
+    return {
+        'ano': datas.astype('datetime64[Y]').view(np.int64) + 1970,
+        'mes': mes,
+        'trimestre': (mes - 1) // 3 + 1,
+        'dia_semana': dia_semana,
+        'semana_ano': semana
+    }
+
+def _corrigir_totais_numpy(quantidade, preco, valor, tolerancia):
+    """
+    Substitui valor_total por quantidade * preco onde a diferença passa da tolerância
+    
+    Returns:
+    --------
+    tuple: (valores corrigidos, número de inconsistências)
+    """
+    calculado = quantidade * preco
+    inconsistente = np.abs(valor - calculado) > tolerancia
+    return np.where(inconsistente, calculado, valor), np.count_nonzero(inconsistente)
+
+def _remover_acima_numpy(valores, mask, limite):
+    """
+    Desmarca em mask (no próprio array) as linhas com valor acima do limite ou nulo
+    
+    Returns:
+    --------
+    int: Número de linhas desmarcadas
+    """
+    removidas = mask & ~(valores <= limite)
+    mask &= ~removidas
+    return np.count_nonzero(removidas)
+
+try:
+    from numba import njit, prange
+    
+    @njit(parallel=True, cache=True)
+    def _corrigir_totais(quantidade, preco, valor, tolerancia):
+        """Mesma correção de `_corrigir_totais_numpy`, numa única varredura paralela"""
+        corrigido = np.empty_like(valor)
+        n_inconsistente = 0
+        for i in prange(len(valor)):
+            calculado = quantidade[i] * preco[i]
+            if abs(valor[i] - calculado) > tolerancia:
+                corrigido[i] = calculado
+                n_inconsistente += 1
+            else:
+                corrigido[i] = valor[i]
+        return corrigido, n_inconsistente
+    
+    @njit(parallel=True, cache=True)
+    def _remover_acima(valores, mask, limite):
+        """Mesmo filtro de `_remover_acima_numpy`: comparação, contagem e máscara numa só varredura"""
+        removidas = 0
+        for i in prange(len(valores)):
+            if mask[i] and not valores[i] <= limite:
+                mask[i] = False
+                removidas += 1
+        return removidas
+except ImportError:  # numba é opcional
+    _corrigir_totais = _corrigir_totais_numpy
+    _remover_acima = _remover_acima_numpy
+
+def _row_mask(df):
+    """Linhas sem nulos críticos e com valores críticos numéricos positivos"""
+    mask = np.ones(len(df), dtype=bool)
+    for col in CRITICAL_COLUMNS:
+        if col in df.columns:
+            mask &= df[col].notna().to_numpy()
+            if pd.api.types.is_numeric_dtype(df[col]):
+                mask &= (df[col] > 0).to_numpy()
+    return mask
+
+def _dedup_subset(columns):
+    """Colunas comparadas na remoção de duplicatas (None = todas)"""
+    chaves = DEDUP_KEY_COLUMNS if 'pedido_id' in columns else DEDUP_FALLBACK_COLUMNS
+    subset = [col for col in chaves if col in columns]
+    return subset or None
+
+def _quantile_threshold(valores, q):
+    """
+    Percentil q com interpolação linear (mesmo resultado de Series.quantile),
+    via seleção parcial com np.partition em vez de ordenar a coluna
+    """
+    n = len(valores)
+    if n == 0:
+        return np.nan
+    posicao = q * (n - 1)
+    inferior = int(np.floor(posicao))
+    superior = min(inferior + 1, n - 1)
+    parcial = np.partition(valores, [inferior, superior])
+    return parcial[inferior] + (parcial[superior] - parcial[inferior]) * (posicao - inferior)
+
+def _estimate_memory(df, amostra=1000):
+    """
+    Uso de memória em bytes sem percorrer todas as strings
+    
+    Colunas numéricas, de data e category são medidas exatamente; colunas de
+    texto são medidas numa amostra de linhas e extrapoladas para o total.
+    """
+    texto = df.select_dtypes(include=['object', 'string']).columns
+    total = df.drop(columns=texto).memory_usage(index=True, deep=True).sum()
+    if len(texto) == 0:
+        return total
+    if len(df) <= amostra:
+        return total + df[texto].memory_usage(index=False, deep=True).sum()
+    parcial = df[texto].sample(amostra, random_state=0).memory_usage(index=False, deep=True).sum()
+    return total + parcial * len(df) / amostra
+
+def _parse_dates(serie):
+    """
+    Converte texto em datetime, tentando primeiro o parser ISO 8601 (caminho
+    rápido em C) e inferindo o formato só quando o texto não é ISO
+    """
+    try:
+        return pd.to_datetime(serie, format='ISO8601', cache=True)
+    except (ValueError, TypeError):
+        return pd.to_datetime(serie, errors='coerce', cache=True)
 
 class DataProcessor:
     """Classe principal para processamento de dados de vendas"""
@@ -11,36 +194,82 @@ class DataProcessor:
         self.data = None
         self.processed_data = None
         
-    def load_data(self, file_path=None, data=None):
+    def load_data(self, file_path=None, data=None, copy=True):
         """
-        Carrega dados de arquivo Excel/CSV ou aceita DataFrame
+        Carrega dados de arquivo Excel/CSV/Parquet ou aceita DataFrame
         
         Parameters:
         -----------
-        file_path : str, optional
-            Caminho para o arquivo de dados
+        file_path : str or file-like, optional
+            Caminho para o arquivo de dados, ou arquivo já aberto (ex.: upload)
+            com atributo `name` indicando a extensão
         data : pd.DataFrame, optional
             DataFrame com dados já carregados
+        copy : bool, default True
+            Se deve copiar `data`. Com False os buffers das colunas são
+            compartilhados com o DataFrame original (cópia rasa), que não é
+            alterado: as conversões de tipo e clean_data trocam colunas em vez
+            de escrever nelas
         """
         if file_path:
-            if file_path.endswith('.xlsx') or file_path.endswith('.xls'):
-                self.data = pd.read_excel(file_path)
-            elif file_path.endswith('.csv'):
-                self.data = pd.read_csv(file_path)
+            nome = str(getattr(file_path, 'name', file_path))
+            if nome.endswith('.xlsx') or nome.endswith('.xls'):
+                self.data = pd.read_excel(file_path, engine=EXCEL_ENGINE)
+            elif nome.endswith(('.csv', '.csv.gz')):
+                self.data = pd.read_csv(file_path, engine=CSV_ENGINE)
+            elif nome.endswith('.parquet'):
+                self.data = pd.read_parquet(file_path, engine='pyarrow')
             else:
-                raise ValueError("Formato de arquivo não suportado. Use .xlsx, .xls ou .csv")
+                raise ValueError("Formato de arquivo não suportado. Use .xlsx, .xls, .csv, .csv.gz ou .parquet")
         elif data is not None:
-            self.data = data.copy()
+            self.data = data.copy() if copy else data.copy(deep=False)
         else:
             raise ValueError("É necessário fornecer file_path ou data")
+        
+        self.data = self._optimize_dtypes(self.data)
             
         print(f"✅ Dados carregados: {len(self.data)} registros")
         return self.data
     
-    def data_quality_check(self):
+    def _optimize_dtypes(self, df):
+        """
+        Reduz o uso de memória logo após a carga
+        
+        Inteiros são rebaixados ao menor tipo que comporta os valores e colunas
+        de texto de baixa cardinalidade viram category. O texto que ainda
+        estiver em object (ex.: IDs de cliente no pandas < 3) passa para
+        string[pyarrow]. Valores monetários continuam float64 para não perder
+        centavos nos totais.
+        """
+        for col in df.select_dtypes(include=['integer']).columns:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        
+        for col in CATEGORY_COLUMNS:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                if df[col].nunique() <= LIMITE_CARDINALIDADE_CATEGORY * len(df):
+                    df[col] = df[col].astype('category')
+        
+        for col in df.select_dtypes(include=['object']).columns:
+            if pd.api.types.infer_dtype(df[col], skipna=True) == 'string':
+                try:
+                    df[col] = df[col].astype('string[pyarrow]')
+                except ImportError:  # pyarrow é opcional
+                    break
+        
+        return df
+    
+    def data_quality_check(self, check_duplicates=False, memory_sample=1000):
         """
         Verifica qualidade dos dados
         
+        Parameters:
+        -----------
+        check_duplicates : bool, default False
+            Se deve contar duplicatas (passo de hashing sobre as colunas-chave;
+            clean_data já as remove)
+        memory_sample : int, default 1000
+            Linhas amostradas para estimar a memória das colunas de texto
+        
         Returns:
         --------
         dict: Relatório de qualidade dos dados
@@ -50,16 +279,20 @@ class DataProcessor:
             
         quality_report = {
             'shape': self.data.shape,
-            'null_values': self.data.isnull().sum().to_dict(),
+            'null_values': self.data.isna().sum().to_dict(),
             'data_types': self.data.dtypes.to_dict(),
-            'duplicates': self.data.duplicated().sum(),
-            'memory_usage': self.data.memory_usage(deep=True).sum() / 1024**2  # MB
+            'duplicates': (
+                int(self.data.duplicated(subset=_dedup_subset(self.data.columns)).sum())
+                if check_duplicates else None
+            ),
+            'memory_usage': _estimate_memory(self.data, memory_sample) / 1024**2  # MB
         }
         
         print("📊 RELATÓRIO DE QUALIDADE DOS DADOS")
         print("-" * 40)
         print(f"Dimensões: {quality_report['shape']}")
-        print(f"Duplicatas: {quality_report['duplicates']}")
+        if check_duplicates:
+            print(f"Duplicatas: {quality_report['duplicates']}")
         print(f"Uso de memória: {quality_report['memory_usage']:.2f} MB")
         print(f"Valores nulos por coluna:")
         for col, nulls in quality_report['null_values'].items():
@@ -68,7 +301,7 @@ class DataProcessor:
         
         return quality_report
     
-    def clean_data(self, remove_outliers=True, outlier_threshold=0.99):
+    def clean_data(self, remove_outliers=True, outlier_threshold=0.99, engine='pandas'):
         """
         Limpa e prepara os dados para análise
         
@@ -78,11 +311,20 @@ class DataProcessor:
             Se deve remover outliers
         outlier_threshold : float, default 0.99
             Percentil para definir outliers
+        engine : {'pandas', 'polars'}, default 'pandas'
+            'polars' executa nulos, duplicatas, valores negativos e outliers
+            como uma única consulta lazy (requer polars)
         """
         if self.data is None:
             raise ValueError("Dados não carregados. Use load_data() primeiro.")
+        if engine not in ('pandas', 'polars'):
+            raise ValueError("engine deve ser 'pandas' ou 'polars'")
+        if engine == 'polars' and pl is None:
+            raise ImportError("Polars não instalado. Instale polars ou use engine='pandas'")
             
-        df = self.data.copy()
+        # Cópia rasa: a limpeza só substitui colunas e filtra (gerando um novo
+        # DataFrame), então self.data nunca é alterado
+        df = self.data.copy(deep=False)
         initial_shape = df.shape[0]
         
         print("🧹 INICIANDO LIMPEZA DOS DADOS")
@@ -90,50 +332,110 @@ class DataProcessor:
         
         # 1. Converter colunas de data
         date_columns = ['data_pedido', 'data_compra', 'date', 'data']
-        for col in df.columns:
-            if any(date_col in col.lower() for date_col in date_columns):
-                df[col] = pd.to_datetime(df[col], errors='coerce')
-                print(f"✅ Convertida coluna de data: {col}")
+        candidates = [col for col in df.columns if any(date_col in col.lower() for date_col in date_columns)]
+        for col in candidates:
+            # Colunas que já são datetime não são reprocessadas
+            if pd.api.types.is_datetime64_any_dtype(df[col]):
+                continue
+            df[col] = _parse_dates(df[col])
+            print(f"✅ Convertida coluna de data: {col}")
+        
+        if engine == 'polars':
+            df = self._clean_polars(df, remove_outliers, outlier_threshold)
+            self._create_derived_columns(df)
+            return self._finish_cleaning(df, initial_shape)
+        
+        # Passos 2 a 5 acumulam uma única máscara booleana, aplicada uma vez no
+        # final; duplicatas e outliers são avaliados só sobre as linhas que ainda
+        # estão na máscara. As mensagens de remoção são impressas juntas no fim
+        mask = np.ones(len(df), dtype=bool)
+        log = []
+        
+        def aplicar(condicao, mensagem):
+            nonlocal mask
+            removidas = np.count_nonzero(mask & ~condicao)
+            mask &= condicao
+            if removidas > 0:
+                log.append(mensagem.format(n=removidas))
         
         # 2. Remover linhas com valores nulos críticos
-        critical_columns = ['valor_total', 'preco_unitario', 'quantidade']
-        for col in critical_columns:
+        for col in CRITICAL_COLUMNS:
             if col in df.columns:
-                before = len(df)
-                df = df.dropna(subset=[col])
-                removed = before - len(df)
-                if removed > 0:
-                    print(f"🗑️ Removidas {removed} linhas com {col} nulo")
-        
-        # 3. Remover duplicatas
-        before_dup = len(df)
-        df = df.drop_duplicates()
-        removed_dup = before_dup - len(df)
-        if removed_dup > 0:
-            print(f"🗑️ Removidas {removed_dup} duplicatas")
-        
-        # 4. Validar valores negativos
+                aplicar(df[col].notna().to_numpy(), f"🗑️ Removidas {{n}} linhas com {col} nulo")
+        
+        # 3. Validar valores negativos
         numeric_columns = df.select_dtypes(include=[np.number]).columns
         for col in numeric_columns:
-            if col in ['valor_total', 'preco_unitario', 'quantidade']:
-                before = len(df)
-                df = df[df[col] > 0]
-                removed = before - len(df)
-                if removed > 0:
-                    print(f"🗑️ Removidas {removed} linhas com {col} negativo/zero")
-        
-        # 5. Remover outliers (se solicitado)
+            if col in CRITICAL_COLUMNS:
+                aplicar((df[col] > 0).to_numpy(), f"🗑️ Removidas {{n}} linhas com {col} negativo/zero")
+        
+        # 4. Remover duplicatas entre as linhas válidas: uma linha já descartada
+        # (nula ou não positiva) não pode contar como primeira ocorrência de uma chave
+        duplicada = np.zeros(len(df), dtype=bool)
+        duplicada[mask] = df[mask].duplicated(subset=_dedup_subset(df.columns), keep='first').to_numpy()
+        aplicar(~duplicada, "🗑️ Removidas {n} duplicatas")
+        
+        # 5. Remover outliers (se solicitado), com o percentil das linhas restantes;
+        # o limite vem da seleção parcial do NumPy e o filtro atualiza a máscara direto
         if remove_outliers and 'valor_total' in df.columns:
-            threshold = df['valor_total'].quantile(outlier_threshold)
-            before = len(df)
-            df = df[df['valor_total'] <= threshold]
-            removed = before - len(df)
-            if removed > 0:
-                print(f"🗑️ Removidos {removed} outliers (acima do percentil {outlier_threshold*100}%)")
+            valores = df['valor_total'].to_numpy(dtype=np.float64)
+            threshold = _quantile_threshold(valores[mask], outlier_threshold)
+            removidas = _remover_acima(valores, mask, threshold)
+            if removidas > 0:
+                log.append(f"🗑️ Removidos {removidas} outliers (acima do percentil {outlier_threshold*100}%)")
+        
+        df = df[mask]
+        if log:
+            print("\n".join(log))
         
         # 6. Criar colunas derivadas
         self._create_derived_columns(df)
         
+        return self._finish_cleaning(df, initial_shape)
+    
+    def clean_data_chunked(self, file_path, chunksize=200_000, remove_outliers=True, outlier_threshold=0.99):
+        """
+        Lê e limpa arquivos grandes em blocos, sem carregar o arquivo inteiro
+        
+        Os filtros que dependem só da própria linha (nulos críticos e valores
+        negativos/zero) são aplicados em cada bloco; apenas as linhas que passam
+        são concatenadas. Duplicatas e outliers dependem do conjunto inteiro e
+        ficam para clean_data, sobre o resultado já reduzido.
+        
+        Parameters:
+        -----------
+        file_path : str
+            Arquivo .csv, .csv.gz ou .parquet
+        chunksize : int, default 200_000
+            Linhas por bloco
+        remove_outliers : bool, default True
+            Se deve remover outliers
+        outlier_threshold : float, default 0.99
+            Percentil para definir outliers
+        """
+        nome = str(file_path)
+        if nome.endswith(('.csv', '.csv.gz')):
+            blocos = pd.read_csv(file_path, chunksize=chunksize)
+        elif nome.endswith('.parquet'):
+            import pyarrow.parquet as pq
+            blocos = (lote.to_pandas() for lote in pq.ParquetFile(file_path).iter_batches(batch_size=chunksize))
+        else:
+            raise ValueError("Leitura em blocos suporta apenas .csv, .csv.gz ou .parquet")
+        
+        partes = []
+        lidos = 0
+        for bloco in blocos:
+            lidos += len(bloco)
+            partes.append(bloco[_row_mask(bloco)])
+        if not partes:
+            raise ValueError("Arquivo sem registros")
+        
+        self.data = self._optimize_dtypes(pd.concat(partes, ignore_index=True))
+        print(f"✅ Dados carregados em blocos: {lidos:,} registros lidos, {len(self.data):,} após filtros por linha")
+        return self.clean_data(remove_outliers=remove_outliers, outlier_threshold=outlier_threshold)
+    
+    def _finish_cleaning(self, df, initial_shape):
+        """Guarda o resultado da limpeza e imprime o resumo"""
         self.processed_data = df
         final_shape = df.shape[0]
         
@@ -144,38 +446,81 @@ class DataProcessor:
         
         return self.processed_data
     
+    def _clean_polars(self, df, remove_outliers, outlier_threshold):
+        """
+        Passos 2 a 5 da limpeza como uma única consulta lazy do Polars
+        
+        Mesma semântica do caminho pandas: nulos críticos, valores não
+        positivos, duplicatas pelas colunas-chave entre as linhas restantes
+        (mantém a primeira ocorrência) e outliers pelo quantil linear.
+        """
+        critical = [col for col in CRITICAL_COLUMNS if col in df.columns]
+        numeric = set(df.select_dtypes(include=[np.number]).columns)
+        
+        lf = pl.from_pandas(df).lazy()
+        if critical:
+            lf = lf.drop_nulls(subset=critical)
+        for col in critical:
+            if col in numeric:
+                lf = lf.filter(pl.col(col) > 0)
+        lf = lf.unique(subset=_dedup_subset(df.columns), keep='first', maintain_order=True)
+        if remove_outliers and 'valor_total' in df.columns:
+            limite = pl.col('valor_total').quantile(outlier_threshold, interpolation='linear')
+            lf = lf.filter(pl.col('valor_total') <= limite)
+        
+        cleaned = lf.collect().to_pandas()
+        removed = len(df) - len(cleaned)
+        if removed > 0:
+            print(f"🗑️ Removidas {removed} linhas (nulos, duplicatas, valores negativos/zero e outliers)")
+        return cleaned
+    
     def _create_derived_columns(self, df):
         """Cria colunas derivadas para análise"""
         
         # Colunas temporais
-        date_col = None
-        for col in df.columns:
-            if 'data' in col.lower() and df[col].dtype == 'datetime64[ns]':
-                date_col = col
-                break
+        date_cols = df.select_dtypes(include='datetime64').columns
+        date_col = next((col for col in date_cols if 'data' in col.lower()), None)
         
         if date_col:
-            df['ano'] = df[date_col].dt.year
-            df['mes'] = df[date_col].dt.month
-            df['mes_nome'] = df[date_col].dt.strftime('%B')
-            df['dia_semana'] = df[date_col].dt.day_name()
-            df['trimestre'] = df[date_col].dt.quarter
-            df['semana_ano'] = df[date_col].dt.isocalendar().week
+            datas = df[date_col].to_numpy()
+            partes = extract_date_parts(datas)
+            validas = ~np.isnat(datas)
+            todas_validas = validas.all()
+            
+            def coluna(valores):
+                # Inteiros quando não há NaT; senão float com NaN, como no acessor .dt
+                return valores.astype(np.int32) if todas_validas else np.where(validas, valores, np.nan)
+            
+            def nomes(tabela, indices):
+                # Categórica ordenada (mês/dia da semana na ordem do calendário): guarda só
+                # códigos de 1 byte por linha em vez de uma string; NaT vira código -1 (NaN)
+                codigos = np.where(validas, indices, -1).astype(np.int8)
+                return pd.Categorical.from_codes(codigos, categories=tabela, ordered=True)
+            
+            df['ano'] = coluna(partes['ano'])
+            df['mes'] = coluna(partes['mes'])
+            df['mes_nome'] = nomes(NOMES_MESES, partes['mes'] - 1)
+            df['dia_semana'] = nomes(NOMES_DIAS_SEMANA, partes['dia_semana'])
+            df['trimestre'] = coluna(partes['trimestre'])
+            df['semana_ano'] = coluna(partes['semana_ano'])
             print("✅ Criadas colunas temporais")
         
         # Validar se valor_total = quantidade * preco_unitario
         required_cols = ['valor_total', 'quantidade', 'preco_unitario']
         if all(col in df.columns for col in required_cols):
-            df['valor_calculado'] = df['quantidade'] * df['preco_unitario']
-            df['diferenca_valor'] = abs(df['valor_total'] - df['valor_calculado'])
-            
-            # Corrigir pequenas diferenças de arredondamento
+            # Corrigir pequenas diferenças de arredondamento, direto nos arrays
+            # NumPy (kernel numba quando disponível), sem colunas auxiliares nem .loc
             tolerance = 0.01
-            inconsistent = df['diferenca_valor'] > tolerance
-            if inconsistent.sum() > 0:
-                print(f"⚠️ Encontradas {inconsistent.sum()} inconsistências de valor")
+            corrigido, n_inconsistent = _corrigir_totais(
+                df['quantidade'].to_numpy(dtype=np.float64),
+                df['preco_unitario'].to_numpy(dtype=np.float64),
+                df['valor_total'].to_numpy(dtype=np.float64),
+                tolerance
+            )
+            if n_inconsistent > 0:
+                print(f"⚠️ Encontradas {n_inconsistent} inconsistências de valor")
                 # Usar o valor calculado como padrão
-                df.loc[inconsistent, 'valor_total'] = df.loc[inconsistent, 'valor_calculado']
+                df['valor_total'] = corrigido
                 print("✅ Valores corrigidos")
         
         return df
@@ -227,13 +572,69 @@ class DataProcessor:
             
         if file_path.endswith('.xlsx'):
             self.processed_data.to_excel(file_path, index=False)
-        elif file_path.endswith('.csv'):
+        elif file_path.endswith(('.csv', '.csv.gz')):
+            # Compressão gzip inferida da extensão .gz
             self.processed_data.to_csv(file_path, index=False)
+        elif file_path.endswith('.parquet'):
+            # Colunar e com tipos preservados: recarrega bem mais rápido que CSV/Excel
+            self.processed_data.to_parquet(file_path, index=False, compression='snappy')
         else:
-            raise ValueError("Formato não suportado. Use .xlsx ou .csv")
+            raise ValueError("Formato não suportado. Use .xlsx, .csv, .csv.gz ou .parquet")
         
         print(f"✅ Dados exportados para: {file_path}")
 
+def to_excel_bytes(df, sheet_name='Dados'):
+    """
+    Serializa um DataFrame em um arquivo .xlsx na memória
+    
+    O xlsxwriter fica no modo padrão: em constant_memory ele só mantém a linha
+    atual, e o to_excel grava coluna a coluna, então as linhas anteriores
+    seriam descartadas sem aviso.
+    
+    Parameters:
+    -----------
+    df : pd.DataFrame
+        Dados a exportar (sem o índice)
+    sheet_name : str, default 'Dados'
+        Nome da planilha
+    """
+    buffer = BytesIO()
+    with pd.ExcelWriter(buffer, engine=XLSX_ENGINE) as writer:
+        df.to_excel(writer, sheet_name=sheet_name, index=False)
+    return buffer.getvalue()
+
+# Produtos e categorias dos dados de exemplo: (produto, categoria, preço base)
+PRODUTOS_INFO = [
+    ('Smartphone Samsung Galaxy', 'Smartphones', 1200),
+    ('iPhone 14', 'Smartphones', 4500),
+    ('Notebook Dell Inspiron', 'Notebooks', 2800),
+    ('Tablet iPad', 'Tablets', 2200),
+    ('Fones JBL Bluetooth', 'Áudio', 300),
+    ('Smartwatch Apple', 'Wearables', 2000),
+    ('Camera Canon EOS', 'Fotografia', 3500),
+    ('TV 55" LG OLED', 'TVs', 2500),
+    ('Notebook Lenovo ThinkPad', 'Notebooks', 3200),
+    ('Mouse Gamer Logitech', 'Periféricos', 150),
+    ('Teclado Mecânico Corsair', 'Periféricos', 400),
+    ('Monitor 24" Samsung', 'Monitores', 800),
+    ('Carregador Wireless', 'Acessórios', 200),
+    ('Caixa de Som JBL', 'Áudio', 500),
+    ('HD Externo 1TB', 'Armazenamento', 300),
+    ('Pendrive 64GB', 'Armazenamento', 80)
+]
+
+# Mesmos dados em arrays por coluna, para o sorteio vetorizado em generate_sample_data
+_PRODUTOS_NOMES, _PRODUTOS_CATEGORIAS, _PRODUTOS_PRECOS = (np.array(coluna) for coluna in zip(*PRODUTOS_INFO))
+_PRODUTOS_PRECOS = _PRODUTOS_PRECOS.astype(np.float64)
+
+# Valores e probabilidades sorteados em generate_sample_data
+_QUANTIDADES = np.array([1, 2, 3, 4, 5], dtype=np.int8)
+_QUANTIDADES_P = np.array([0.6, 0.2, 0.1, 0.06, 0.04])
+_ESTADOS = np.array(['SP', 'RJ', 'MG', 'RS', 'PR', 'SC', 'BA', 'GO'], dtype=object)
+_ESTADOS_P = np.array([0.35, 0.15, 0.12, 0.08, 0.08, 0.05, 0.07, 0.10])
+_CANAIS = np.array(['Online', 'Marketplace', 'App Mobile'], dtype=object)
+_CANAIS_P = np.array([0.5, 0.35, 0.15])
+
 def generate_sample_data(n_records=5000):
     """
     Gera dados de exemplo para demonstração
@@ -247,63 +648,35 @@ def generate_sample_data(n_records=5000):
     --------
     pd.DataFrame: Dados de exemplo
     """
-    np.random.seed(42)
+    rng = np.random.default_rng(42)
+    
+    # Gerando dados: cada coluna sorteada de uma vez, sem laço por registro
+    # Data aleatória nos últimos 12 meses
+    dias_atras = rng.integers(0, 365, n_records).astype('timedelta64[D]')
+    data_pedido = (np.datetime64(datetime.now()) - dias_atras).astype('datetime64[ns]')
+    
+    # Produto aleatório
+    idx = rng.integers(0, len(PRODUTOS_INFO), n_records)
     
-    # Produtos e categorias
-    produtos_info = [
-        ('Smartphone Samsung Galaxy', 'Smartphones', 1200),
-        ('iPhone 14', 'Smartphones', 4500),
-        ('Notebook Dell Inspiron', 'Notebooks', 2800),
-        ('Tablet iPad', 'Tablets', 2200),
-        ('Fones JBL Bluetooth', 'Áudio', 300),
-        ('Smartwatch Apple', 'Wearables', 2000),
-        ('Camera Canon EOS', 'Fotografia', 3500),
-        ('TV 55" LG OLED', 'TVs', 2500),
-        ('Notebook Lenovo ThinkPad', 'Notebooks', 3200),
-        ('Mouse Gamer Logitech', 'Periféricos', 150),
-        ('Teclado Mecânico Corsair', 'Periféricos', 400),
-        ('Monitor 24" Samsung', 'Monitores', 800),
-        ('Carregador Wireless', 'Acessórios', 200),
-        ('Caixa de Som JBL', 'Áudio', 500),
-        ('HD Externo 1TB', 'Armazenamento', 300),
-        ('Pendrive 64GB', 'Armazenamento', 80)
-    ]
+    # Variação de preço
+    preco_unitario = np.round(_PRODUTOS_PRECOS[idx] * rng.uniform(0.8, 1.2, n_records), 2)
     
-    # Gerando dados
-    dados = []
-    for i in range(n_records):
-        # Data aleatória nos últimos 12 meses
-        data_pedido = datetime.now() - timedelta(days=np.random.randint(0, 365))
-        
-        # Produto aleatório
-        produto, categoria, preco_base = produtos_info[np.random.randint(0, len(produtos_info))]
-        
-        # Variação de preço
-        preco_unitario = round(preco_base * np.random.uniform(0.8, 1.2), 2)
-        
-        # Quantidade
-        quantidade = np.random.choice([1, 2, 3, 4, 5], p=[0.6, 0.2, 0.1, 0.06, 0.04])
-        
-        # Outros campos
-        cliente_id = np.random.randint(1000, 9999)
-        estado = np.random.choice(['SP', 'RJ', 'MG', 'RS', 'PR', 'SC', 'BA', 'GO'], 
-                                 p=[0.35, 0.15, 0.12, 0.08, 0.08, 0.05, 0.07, 0.10])
-        canal = np.random.choice(['Online', 'Marketplace', 'App Mobile'], p=[0.5, 0.35, 0.15])
-        
-        dados.append({
-            'pedido_id': f'PED{i+1000:04d}',
-            'data_pedido': data_pedido,
-            'cliente_id': cliente_id,
-            'produto': produto,
-            'categoria': categoria,
-            'quantidade': quantidade,
-            'preco_unitario': preco_unitario,
-            'valor_total': round(quantidade * preco_unitario, 2),
-            'estado': estado,
-            'canal_venda': canal
-        })
+    # Quantidade
+    quantidade = rng.choice(_QUANTIDADES, n_records, p=_QUANTIDADES_P)
     
-    return pd.DataFrame(dados)
+    return pd.DataFrame({
+        # Identificador numérico (int32) em vez de strings 'PED1000' formatadas por linha
+        'pedido_id': np.arange(1000, n_records + 1000, dtype=np.int32),
+        'data_pedido': data_pedido,
+        'cliente_id': rng.integers(1000, 9999, n_records),
+        'produto': _PRODUTOS_NOMES[idx],
+        'categoria': _PRODUTOS_CATEGORIAS[idx],
+        'quantidade': quantidade,
+        'preco_unitario': preco_unitario,
+        'valor_total': np.round(quantidade * preco_unitario, 2),
+        'estado': rng.choice(_ESTADOS, n_records, p=_ESTADOS_P),
+        'canal_venda': rng.choice(_CANAIS, n_records, p=_CANAIS_P)
+    })
 
 # Exemplo de uso
 if __name__ == "__main__":
@@ -1,212 +1,463 @@
 import os
 import sys
+import hashlib
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
 from datetime import datetime
+from pathlib import Path
 import warnings
-warnings.filterwarnings('ignore')
 
-# Importar módulos do projeto
+# Mensagens de progresso do projeto. Em notebooks/CI, log.setLevel(logging.WARNING)
+# deixa só avisos e erros na saída
+log = logging.getLogger('ecommerce_analysis')
+if not log.handlers:
+    _handler = logging.StreamHandler(sys.stdout)
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    log.addHandler(_handler)
+    log.setLevel(logging.INFO)
+    log.propagate = False
+
+# Importar módulos do projeto; visualization (matplotlib/seaborn) e
+# business_analysis são importados só pelas etapas que os usam
 try:
     from data_processing import DataProcessor, generate_sample_data
-    from visualization import EcommerceVisualizer, setup_visualization_style
-    from business_analysis import BusinessAnalyzer
 except ImportError as e:
-    print(f"❌ Erro ao importar módulos: {e}")
-    print("📁 Certifique-se de que todos os arquivos .py estão no mesmo diretório")
+    log.error(f"❌ Erro ao importar módulos: {e}")
+    log.info("📁 Certifique-se de que todos os arquivos .py estão no mesmo diretório")
     sys.exit(1)
 
+# Colunas usadas pelo processamento e pelas análises; os leitores rápidos
+# (io_engine='polars'/'pyarrow') leem só estas, quando presentes no arquivo
+PROJECT_COLUMNS = (
+    'pedido_id', 'data_pedido', 'cliente_id', 'produto', 'categoria', 'quantidade',
+    'preco_unitario', 'valor_total', 'estado', 'canal_venda'
+)
+
+# Diretórios criados por create_project_structure
+PROJECT_DIRECTORIES = (
+    'data/raw',
+    'data/processed',
+    'data/sample',
+    'reports/figures',
+    'reports/insights',
+    'notebooks',
+    'exports'
+)
+
+# Resolução dos PNGs exportados pelo pipeline (EcommerceVisualizer.export_charts
+# recorta as margens com bbox_inches='tight': nem todo gráfico usa tight_layout)
+CHART_DPI = 100
+
+# Template Jinja2 do relatório executivo
+REPORT_TEMPLATE_DIR = Path(__file__).resolve().parent.parent / 'reports' / 'templates'
+REPORT_TEMPLATE = 'executive.md.j2'
+
+# Gráficos gerados por create_visualizations: (arquivo, título, método do visualizador, argumentos)
+CHART_JOBS = (
+    ('executive_dashboard', 'Dashboard Executivo', 'create_executive_dashboard', {}),
+    ('revenue_evolution', 'Evolução da Receita', 'plot_revenue_evolution', {'period': 'month'}),
+    ('top_products_revenue', 'Top Produtos', 'plot_top_products', {'metric': 'revenue', 'top_n': 10}),
+    ('category_analysis', 'Análise de Categorias', 'plot_category_analysis', {}),
+    ('geographic_analysis', 'Análise Geográfica', 'plot_geographic_analysis', {}),
+    ('channel_analysis', 'Análise de Canais', 'plot_channel_analysis', {}),
+    ('seasonal_analysis', 'Análise Sazonal', 'plot_seasonal_analysis', {}),
+    ('customer_analysis', 'Análise de Clientes', 'plot_customer_analysis', {})
+)
+
+@functools.lru_cache(maxsize=None)
+def _create_directories(raiz):
+    """
+    Cria PROJECT_DIRECTORIES sob raiz uma única vez por processo
+    
+    Novas instâncias do projeto no mesmo diretório (notebooks, testes) reaproveitam
+    o resultado em cache em vez de repetir os makedirs.
+    """
+    for directory in PROJECT_DIRECTORIES:
+        os.makedirs(os.path.join(raiz, directory), exist_ok=True)
+
+@functools.lru_cache(maxsize=1)
+def _report_template():
+    """
+    Template Jinja2 do relatório executivo, compilado uma única vez por processo
+    """
+    from jinja2 import Environment, FileSystemLoader
+    
+    env = Environment(
+        loader=FileSystemLoader(str(REPORT_TEMPLATE_DIR)),
+        auto_reload=False,
+        trim_blocks=True,
+        lstrip_blocks=True,
+        keep_trailing_newline=True
+    )
+    env.filters['fmt'] = format
+    return env.get_template(REPORT_TEMPLATE)
+
+def _select_chart_jobs(charts=None):
+    """Entradas de CHART_JOBS para os nomes pedidos (None = todos), na ordem de CHART_JOBS"""
+    if charts is None:
+        return CHART_JOBS
+    if isinstance(charts, str):
+        charts = [charts]
+    desconhecidos = set(charts) - {job[0] for job in CHART_JOBS}
+    if desconhecidos:
+        disponiveis = ', '.join(job[0] for job in CHART_JOBS)
+        raise ValueError(f"Gráficos desconhecidos: {', '.join(sorted(desconhecidos))}. Disponíveis: {disponiveis}")
+    return tuple(job for job in CHART_JOBS if job[0] in charts)
+
+# Formato dos dados salvos pelo projeto: Parquet é colunar, preserva os tipos
+# e grava/lê muito mais rápido que Excel; .xlsx só sob demanda (use_excel=True)
+DATA_FORMAT = 'parquet'
+
+# Versão da lógica de limpeza (clean_data/_optimize_dtypes): entra na chave do
+# cache de dados processados; incremente ao mudar o processamento para que os
+# caches gravados pela versão anterior deixem de ser lidos
+PROCESSING_VERSION = 2
+
 class EcommerceAnalysisProject:
     """Classe principal do projeto de análise de e-commerce"""
     
-    def __init__(self, project_name="Análise de Vendas E-commerce"):
+    def __init__(self, project_name="Análise de Vendas E-commerce", use_excel=False):
         self.project_name = project_name
         self.data_processor = None
         self.visualizer = None
         self.business_analyzer = None
         self.processed_data = None
+        self._analyzed_data = None  # dados processados de onde saíram os insights atuais
+        self._data_source = None  # arquivo carregado (None para dados simulados)
+        
+        # Arquivos de dados gerados (Excel apenas para inspeção manual)
+        extensao = 'xlsx' if use_excel else DATA_FORMAT
+        self.sample_path = f'data/sample/ecommerce_sample_data.{extensao}'
+        self.processed_path = f'data/processed/ecommerce_processed_data.{extensao}'
         
         # Criar estrutura de diretórios
         self.create_project_structure()
         
-        print("🚀 " + "="*60)
-        print(f"   {self.project_name.upper()}")
-        print("="*60)
-        print("📊 Projeto de Data Science para análise estratégica de vendas")
-        print(f"🕒 Iniciado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
-        print("-"*60)
+        log.info("🚀 " + "="*60)
+        log.info(f"   {self.project_name.upper()}")
+        log.info("="*60)
+        log.info("📊 Projeto de Data Science para análise estratégica de vendas")
+        log.info(f"🕒 Iniciado em: {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}")
+        log.info("-"*60)
     
     def create_project_structure(self):
         """Cria estrutura de diretórios do projeto"""
-        directories = [
-            'data/raw',
-            'data/processed',
-            'data/sample',
-            'reports/figures',
-            'reports/insights',
-            'notebooks',
-            'exports'
-        ]
-        
-        for directory in directories:
-            os.makedirs(directory, exist_ok=True)
-        
-        print("📁 Estrutura de diretórios criada!")
+        _create_directories(os.getcwd())
+        log.info("📁 Estrutura de diretórios criada!")
     
-    def load_data(self, file_path=None, use_sample_data=True, n_samples=5000):
+    def load_data(self, file_path=None, use_sample_data=True, n_samples=5000, io_engine='pandas',
+                  save_sample=False):
         """
         Carrega dados para análise
         
         Parameters:
         -----------
         file_path : str, optional
-            Caminho para arquivo de dados reais
+            Caminho para arquivo de dados reais (.parquet, .csv, .xlsx ou .xls)
         use_sample_data : bool, default True
             Se deve usar dados simulados
         n_samples : int, default 5000
             Número de registros de exemplo
+        io_engine : {'pandas', 'polars', 'pyarrow'}, default 'pandas'
+            Leitor de arquivos .csv/.parquet. 'polars' e 'pyarrow' leem só as
+            colunas do projeto (PROJECT_COLUMNS); sem a biblioteca instalada,
+            ou para Excel, a leitura volta para pandas
+        save_sample : bool, default False
+            Se deve salvar os dados simulados em data/sample/ (Parquet, ou
+            Excel quando o projeto usa use_excel=True)
         """
-        print("\n📥 CARREGANDO DADOS")
-        print("-" * 30)
+        log.info("\n📥 CARREGANDO DADOS")
+        log.info("-" * 30)
         
         self.data_processor = DataProcessor()
+        self._data_source = None
         
         if file_path and os.path.exists(file_path):
-            print(f"📂 Carregando dados de: {file_path}")
-            raw_data = self.data_processor.load_data(file_path=file_path)
+            self._data_source = file_path
+            log.info(f"📂 Carregando dados de: {file_path}")
+            dados = self._read_fast(file_path, io_engine) if io_engine != 'pandas' else None
+            if dados is not None:
+                raw_data = self.data_processor.load_data(data=dados, copy=False)
+            else:
+                raw_data = self.data_processor.load_data(file_path=file_path)
         elif use_sample_data:
-            print(f"🎲 Gerando {n_samples:,} registros de dados simulados...")
+            log.info(f"🎲 Gerando {n_samples:,} registros de dados simulados...")
             raw_data = generate_sample_data(n_samples)
             self.data_processor.load_data(data=raw_data)
             
-            # Salvar dados de exemplo
-            sample_path = 'data/sample/ecommerce_sample_data.xlsx'
-            raw_data.to_excel(sample_path, index=False)
-            print(f"💾 Dados de exemplo salvos em: {sample_path}")
+            if save_sample:
+                if self.sample_path.endswith('.xlsx'):
+                    raw_data.to_excel(self.sample_path, index=False)
+                else:
+                    raw_data.to_parquet(self.sample_path, index=False, compression='snappy')
+                log.info(f"💾 Dados de exemplo salvos em: {self.sample_path}")
         else:
             raise ValueError("É necessário fornecer um arquivo de dados ou usar dados simulados")
         
         return raw_data
     
-    def process_data(self, remove_outliers=True):
+    def _read_fast(self, file_path, io_engine):
+        """
+        Lê .csv/.parquet com Polars ou PyArrow, projetando só as colunas do projeto
+        
+        Returns:
+        --------
+        pd.DataFrame or None: None quando o engine não se aplica (Excel) ou não está instalado
+        """
+        if io_engine not in ('polars', 'pyarrow'):
+            raise ValueError("io_engine deve ser 'pandas', 'polars' ou 'pyarrow'")
+        extensao = os.path.splitext(file_path)[1].lower()
+        if extensao not in ('.csv', '.parquet'):
+            return None
+        
+        try:
+            if io_engine == 'polars':
+                import polars as pl
+                scan = pl.scan_csv(file_path) if extensao == '.csv' else pl.scan_parquet(file_path)
+                colunas = [col for col in scan.collect_schema().names() if col in PROJECT_COLUMNS]
+                # Projeção empurrada para o leitor: colunas fora do projeto nem são lidas
+                return scan.select(colunas).collect().to_pandas()
+            
+            import pyarrow.csv as pa_csv
+            import pyarrow.parquet as pq
+            if extensao == '.parquet':
+                colunas = [col for col in pq.read_schema(file_path).names if col in PROJECT_COLUMNS]
+                return pq.read_table(file_path, columns=colunas).to_pandas()
+            # O leitor em streaming só lê o primeiro bloco para descobrir o esquema
+            with pa_csv.open_csv(file_path) as leitor:
+                colunas = [col for col in leitor.schema.names if col in PROJECT_COLUMNS]
+            opcoes = pa_csv.ConvertOptions(include_columns=colunas)
+            return pa_csv.read_csv(file_path, convert_options=opcoes).to_pandas()
+        except ImportError:
+            log.info(f"⚠️ {io_engine} não instalado, usando pandas")
+            return None
+    
+    def process_data(self, remove_outliers=True, force=False):
         """
         Processa e limpa os dados
         
+        Dados lidos de arquivo ficam em cache em data/processed/cache_<fonte>_<hash>.parquet,
+        com a chave calculada sobre o conteúdo dos dados brutos e PROCESSING_VERSION;
+        reexecuções com os mesmos dados apenas leem o Parquet. Cada arquivo de origem
+        mantém um único cache (o anterior é apagado ao gravar um novo). Dados simulados
+        mudam a cada execução e não passam pelo cache.
+        
         Parameters:
         -----------
         remove_outliers : bool, default True
             Se deve remover outliers
+        force : bool, default False
+            Se deve reprocessar mesmo com cache disponível
         """
-        print("\n🧹 PROCESSANDO DADOS")
-        print("-" * 30)
+        log.info("\n🧹 PROCESSANDO DADOS")
+        log.info("-" * 30)
         
         if self.data_processor is None:
             raise ValueError("Dados não carregados. Execute load_data() primeiro.")
         
-        # Verificar qualidade dos dados
-        quality_report = self.data_processor.data_quality_check()
+        cache_path = None
+        if self._data_source is not None:
+            cache_path = self._processed_cache_path(self.data_processor.data, remove_outliers, self._data_source)
         
-        # Limpar e processar dados
-        self.processed_data = self.data_processor.clean_data(remove_outliers=remove_outliers)
+        if cache_path and not force and os.path.exists(cache_path):
+            log.info(f"⚡ Dados já processados, lidos do cache: {cache_path}")
+            self.processed_data = pd.read_parquet(cache_path)
+        else:
+            # Verificar qualidade dos dados
+            quality_report = self.data_processor.data_quality_check()
+            
+            # Limpar e processar dados
+            self.processed_data = self._optimize_dtypes(
+                self.data_processor.clean_data(remove_outliers=remove_outliers)
+            )
+            if cache_path:
+                self.processed_data.to_parquet(cache_path, compression='zstd')
+                self._prune_processed_cache(cache_path)
+        self.processed_data = self._ensure_contiguous_columns(self.processed_data)
+        self.data_processor.processed_data = self.processed_data
         
         # Salvar dados processados
-        processed_path = 'data/processed/ecommerce_processed_data.xlsx'
-        self.data_processor.export_processed_data(processed_path)
-        print(f"💾 Dados processados salvos em: {processed_path}")
+        self.data_processor.export_processed_data(self.processed_path)
+        log.info(f"💾 Dados processados salvos em: {self.processed_path}")
         
         # Estatísticas básicas
         stats = self.data_processor.get_basic_stats()
-        print(f"\n📊 RESUMO DOS DADOS PROCESSADOS:")
-        print(f"• Total de registros: {stats['total_records']:,}")
+        log.info(f"\n📊 RESUMO DOS DADOS PROCESSADOS:")
+        log.info(f"• Total de registros: {stats['total_records']:,}")
         if stats['date_range']['start']:
-            print(f"• Período: {stats['date_range']['start']} a {stats['date_range']['end']}")
-        print(f"• Produtos únicos: {stats['unique_counts']['produtos']:,}")
-        print(f"• Clientes únicos: {stats['unique_counts']['clientes']:,}")
-        print(f"• Receita total: R$ {stats['financial_summary']['receita_total']:,.2f}")
-        print(f"• Ticket médio: R$ {stats['financial_summary']['ticket_medio']:.2f}")
+            log.info(f"• Período: {stats['date_range']['start']} a {stats['date_range']['end']}")
+        log.info(f"• Produtos únicos: {stats['unique_counts']['produtos']:,}")
+        log.info(f"• Clientes únicos: {stats['unique_counts']['clientes']:,}")
+        log.info(f"• Receita total: R$ {stats['financial_summary']['receita_total']:,.2f}")
+        log.info(f"• Ticket médio: R$ {stats['financial_summary']['ticket_medio']:.2f}")
         
         return self.processed_data
     
-    def create_visualizations(self, save_charts=True):
+    @staticmethod
+    def _processed_cache_path(raw_data, remove_outliers, source):
+        """
+        Caminho do cache de dados processados: prefixo do arquivo de origem e
+        chave sobre o conteúdo dos dados brutos, as opções e PROCESSING_VERSION
+        """
+        fonte = hashlib.blake2b(os.path.abspath(source).encode(), digest_size=4).hexdigest()
+        hasher = hashlib.blake2b(digest_size=8)
+        hasher.update(pd.util.hash_pandas_object(raw_data, index=False).to_numpy().tobytes())
+        hasher.update(repr((list(raw_data.columns), list(raw_data.dtypes.astype(str)),
+                            remove_outliers, PROCESSING_VERSION)).encode())
+        return f'data/processed/cache_{fonte}_{hasher.hexdigest()}.parquet'
+    
+    @staticmethod
+    def _prune_processed_cache(cache_path):
+        """Apaga os caches anteriores do mesmo arquivo de origem, mantendo só cache_path"""
+        pasta, nome = os.path.split(cache_path)
+        prefixo = nome[:nome.rindex('_') + 1]  # cache_<fonte>_
+        for antigo in Path(pasta).glob(f'{prefixo}*.parquet'):
+            if antigo.name != nome:
+                antigo.unlink(missing_ok=True)
+    
+    @staticmethod
+    def _ensure_contiguous_columns(df):
+        """
+        Garante que cada coluna numérica ocupe um buffer contíguo
+        
+        O pandas guarda as colunas de um mesmo tipo como linhas de um array 2D
+        (colunas × registros). Quando esse array vem transposto de uma matriz
+        registro a registro, cada coluna fica espaçada na memória e as
+        agregações da análise saltam entre posições em vez de ler um vetor
+        contínuo. Só as colunas fora desse layout são copiadas.
+        """
+        for col in df.select_dtypes(include=['number', 'bool']).columns:
+            valores = df[col].to_numpy()
+            if not valores.flags.c_contiguous:
+                df[col] = np.ascontiguousarray(valores)
+        return df
+    
+    @staticmethod
+    def _optimize_dtypes(df, limite_cardinalidade=0.5):
+        """
+        Converte colunas de texto de baixa cardinalidade para category e
+        rebaixa inteiros, para as agregações de análise e visualização
+        
+        Parameters:
+        -----------
+        df : pd.DataFrame
+            Dados processados (alterados no próprio objeto)
+        limite_cardinalidade : float, default 0.5
+            Razão máxima valores únicos / registros para virar category
+        """
+        memoria_antes = df.memory_usage(deep=True).sum()
+        
+        for col in df.select_dtypes(include=['object', 'string']).columns:
+            if df[col].nunique() < limite_cardinalidade * len(df):
+                df[col] = df[col].astype('category')
+        for col in df.select_dtypes(include=['integer']).columns:
+            df[col] = pd.to_numeric(df[col], downcast='integer')
+        
+        memoria_depois = df.memory_usage(deep=True).sum()
+        log.info(f"🗜️ Memória dos dados processados: {memoria_antes / 1024**2:.2f} MB → {memoria_depois / 1024**2:.2f} MB")
+        return df
+    
+    def create_visualizations(self, save_charts=True, dpi=CHART_DPI, charts=None):
         """
         Cria visualizações dos dados
         
         Parameters:
         -----------
         save_charts : bool, default True
-            Se deve salvar gráficos em arquivos
+            Se deve salvar gráficos em arquivos (gerados com backend Agg, sem
+            abrir janelas)
+        dpi : int, default CHART_DPI
+            Resolução dos PNGs salvos (ex.: 300 para impressão)
+        charts : list of str, optional
+            Nomes dos gráficos a gerar (primeiro campo de CHART_JOBS, ex.:
+            ['executive_dashboard', 'revenue_evolution']); None gera todos
         """
-        print("\n📊 CRIANDO VISUALIZAÇÕES")
-        print("-" * 30)
+        log.info("\n📊 CRIANDO VISUALIZAÇÕES")
+        log.info("-" * 30)
         
         if self.processed_data is None:
             raise ValueError("Dados não processados. Execute process_data() primeiro.")
         
+        jobs = _select_chart_jobs(charts)
+        
+        from visualization import EcommerceVisualizer, setup_visualization_style
+        
         # Configurar estilo das visualizações
         setup_visualization_style()
         
         # Inicializar visualizador
         self.visualizer = EcommerceVisualizer(self.processed_data)
         
-        print("📈 Gerando gráficos principais...")
+        if save_charts:
+            self._export_charts_parallel(jobs, output_dir='reports/figures/', dpi=dpi)
+        else:
+            log.info("📈 Gerando gráficos principais...")
+            for _, titulo, method, kwargs in jobs:
+                log.info(f"  → {titulo}")
+                with warnings.catch_warnings():
+                    warnings.simplefilter('ignore', category=UserWarning)
+                    getattr(self.visualizer, method)(**kwargs)
+        
+        log.info("✅ Visualizações criadas com sucesso!")
+    
+    def _export_charts_parallel(self, jobs=CHART_JOBS, output_dir='reports/figures/', dpi=CHART_DPI):
+        """
+        Desenha e salva os gráficos de jobs (entradas de CHART_JOBS)
         
-        # 1. Dashboard executivo
-        print("  → Dashboard Executivo")
-        self.visualizer.create_executive_dashboard(
-            save_path='reports/figures/executive_dashboard.png' if save_charts else None
+        Usa EcommerceVisualizer.export_charts: pool de processos com backend Agg
+        quando há mais de um núcleo, geração em sequência (também com Agg)
+        quando há um só.
+        """
+        log.info(f"💾 Gerando e exportando {len(jobs)} gráficos...")
+        resultados = self.visualizer.export_charts(
+            output_dir=output_dir,
+            dpi=dpi,
+            jobs=[(chart_name, method, kwargs) for chart_name, _, method, kwargs in jobs],
+            verbose=False
         )
         
-        # 2. Evolução da receita
-        print("  → Evolução da Receita")
-        self.visualizer.plot_revenue_evolution(period='month')
-        
-        # 3. Análise de produtos
-        print("  → Top Produtos")
-        self.visualizer.plot_top_products(metric='revenue', top_n=10)
-        
-        # 4. Análise de categorias
-        print("  → Análise de Categorias")
-        self.visualizer.plot_category_analysis()
-        
-        # 5. Análise geográfica
-        print("  → Análise Geográfica")
-        self.visualizer.plot_geographic_analysis()
-        
-        # 6. Análise de canais
-        print("  → Análise de Canais")
-        self.visualizer.plot_channel_analysis()
-        
-        # 7. Análise sazonal
-        print("  → Análise Sazonal")
-        self.visualizer.plot_seasonal_analysis()
-        
-        # 8. Análise de clientes
-        print("  → Análise de Clientes")
-        self.visualizer.plot_customer_analysis()
-        
-        if save_charts:
-            print("💾 Exportando todos os gráficos...")
-            self.visualizer.export_charts(output_dir='reports/figures/')
-        
-        print("✅ Visualizações criadas com sucesso!")
+        for chart_name, erro in resultados:
+            if erro is None:
+                log.info(f"✅ {chart_name}.png exportado")
+            else:
+                log.error(f"❌ Erro ao exportar {chart_name}: {erro}")
     
-    def perform_business_analysis(self):
+    def perform_business_analysis(self, force=False):
         """
         Executa análise de negócio completa
+        
+        Os insights ficam no analisador; novas chamadas sobre os mesmos dados
+        processados devolvem esse resultado em vez de refazer as análises.
+        
+        Parameters:
+        -----------
+        force : bool, default False
+            Se deve refazer as análises mesmo com insights já calculados
         """
-        print("\n💼 ANÁLISE DE NEGÓCIO")
-        print("-" * 30)
+        log.info("\n💼 ANÁLISE DE NEGÓCIO")
+        log.info("-" * 30)
         
         if self.processed_data is None:
             raise ValueError("Dados não processados. Execute process_data() primeiro.")
         
+        if (not force and self.business_analyzer is not None and self.business_analyzer.insights
+                and self._analyzed_data is self.processed_data):
+            log.info("⚡ Insights já calculados para estes dados, reaproveitados")
+            return self.business_analyzer.insights
+        
+        from business_analysis import BusinessAnalyzer
+        
         # Inicializar analisador de negócios
         self.business_analyzer = BusinessAnalyzer(self.processed_data)
         
-        print("🔍 Executando análises estratégicas...")
+        log.info("🔍 Executando análises estratégicas...")
         
         # Gerar insights completos
         insights = self.business_analyzer.generate_comprehensive_insights()
+        self._analyzed_data = self.processed_data
         
         # Exportar relatório de insights
         report_path = 'reports/insights/business_insights_report.txt'
@@ -218,128 +469,28 @@ class EcommerceAnalysisProject:
         """
         Gera relatório resumo do projeto
         """
-        print("\n📋 GERANDO RELATÓRIO RESUMO")
-        print("-" * 30)
+        log.info("\n📋 GERANDO RELATÓRIO RESUMO")
+        log.info("-" * 30)
         
         if self.business_analyzer is None:
             raise ValueError("Análise de negócio não executada. Execute perform_business_analysis() primeiro.")
         
         report_path = 'reports/RELATORIO_EXECUTIVO_VENDAS.md'
         
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write("# 📊 RELATÓRIO EXECUTIVO - ANÁLISE DE VENDAS E-COMMERCE\n\n")
-            f.write(f"**Data:** {datetime.now().strftime('%d/%m/%Y')}\n")
-            f.write(f"**Projeto:** {self.project_name}\n\n")
-            
-            f.write("---\n\n")
-            
-            # Resumo executivo
-            f.write("## 🎯 RESUMO EXECUTIVO\n\n")
-            
-            metrics = self.business_analyzer.insights.get('metricas_principais', {})
-            if metrics:
-                f.write("### Métricas Principais\n\n")
-                f.write(f"- **💰 Receita Total:** R$ {metrics.get('receita_total', 0):,.2f}\n")
-                f.write(f"- **🎫 Ticket Médio:** R$ {metrics.get('ticket_medio', 0):.2f}\n")
-                f.write(f"- **📦 Total de Pedidos:** {metrics.get('num_pedidos', 0):,}\n")
-                f.write(f"- **👥 Clientes Únicos:** {metrics.get('num_clientes', 0):,}\n")
-                f.write(f"- **🛍️ Produtos Únicos:** {metrics.get('num_produtos', 0):,}\n")
-                f.write(f"- **📅 Período Analisado:** {metrics.get('periodo_dias', 0)} dias\n\n")
-            
-            # Principais descobertas
-            estrategicos = self.business_analyzer.insights.get('estrategicos', {})
-            if estrategicos:
-                f.write("### 💡 Principais Descobertas\n\n")
-                for descoberta in estrategicos.get('principais_descobertas', []):
-                    f.write(f"- {descoberta}\n")
-                f.write("\n")
-            
-            # Performance de produtos
-            produtos = self.business_analyzer.insights.get('produtos', {})
-            if produtos:
-                f.write("## 🏆 ANÁLISE DE PRODUTOS\n\n")
-                
-                produto_destaque = produtos.get('produto_destaque', {})
-                if produto_destaque:
-                    f.write("### Produto Destaque\n")
-                    f.write(f"- **Nome:** {produto_destaque.get('nome', 'N/A')}\n")
-                    f.write(f"- **Receita:** R$ {produto_destaque.get('receita', 0):,.2f}\n")
-                    f.write(f"- **Participação:** {produto_destaque.get('participacao_receita', 0):.1f}%\n\n")
-                
-                f.write("### Top 5 Produtos por Receita\n\n")
-                top_receita = produtos.get('top_10_receita', {})
-                for i, (produto, receita) in enumerate(list(top_receita.items())[:5], 1):
-                    f.write(f"{i}. **{produto}:** R$ {receita:,.2f}\n")
-                f.write("\n")
-            
-            # Análise de categorias
-            categorias = self.business_analyzer.insights.get('categorias', {})
-            if categorias:
-                f.write("## 📊 ANÁLISE DE CATEGORIAS\n\n")
-                
-                cat_lider = categorias.get('categoria_lider', {})
-                if cat_lider:
-                    f.write("### Categoria Líder\n")
-                    f.write(f"- **Nome:** {cat_lider.get('nome', 'N/A')}\n")
-                    f.write(f"- **Receita:** R$ {cat_lider.get('receita', 0):,.2f}\n")
-                    f.write(f"- **Participação:** {cat_lider.get('participacao', 0):.1f}%\n\n")
-            
-            # Análise geográfica
-            geografia = self.business_analyzer.insights.get('geografia', {})
-            if geografia:
-                f.write("## 🗺️ ANÁLISE GEOGRÁFICA\n\n")
-                
-                estado_lider = geografia.get('estado_lider', {})
-                if estado_lider:
-                    f.write("### Estado Líder\n")
-                    f.write(f"- **Estado:** {estado_lider.get('nome', 'N/A')}\n")
-                    f.write(f"- **Receita:** R$ {estado_lider.get('receita', 0):,.2f}\n")
-                    f.write(f"- **Participação:** {estado_lider.get('participacao', 0):.1f}%\n\n")
-            
-            # Análise de canais
-            canais = self.business_analyzer.insights.get('canais', {})
-            if canais:
-                f.write("## 📱 ANÁLISE DE CANAIS\n\n")
-                
-                canal_lider = canais.get('canal_lider', {})
-                if canal_lider:
-                    f.write("### Canal Líder\n")
-                    f.write(f"- **Canal:** {canal_lider.get('nome', 'N/A')}\n")
-                    f.write(f"- **Receita:** R$ {canal_lider.get('receita', 0):,.2f}\n")
-                    f.write(f"- **Participação:** {canal_lider.get('participacao', 0):.1f}%\n\n")
-            
-            # Recomendações
-            if estrategicos:
-                f.write("## 🚀 RECOMENDAÇÕES ESTRATÉGICAS\n\n")
-                
-                f.write("### Ações Imediatas\n\n")
-                for rec in estrategicos.get('recomendacoes_imediatas', []):
-                    f.write(f"- {rec}\n")
-                f.write("\n")
-                
-                f.write("### Ações de Médio Prazo\n\n")
-                for rec in estrategicos.get('recomendacoes_medio_prazo', []):
-                    f.write(f"- {rec}\n")
-                f.write("\n")
-                
-                f.write("### KPIs para Monitoramento\n\n")
-                for kpi in estrategicos.get('kpis_monitoramento', []):
-                    f.write(f"- {kpi}\n")
-                f.write("\n")
-            
-            f.write("---\n\n")
-            f.write("## 📁 ARQUIVOS GERADOS\n\n")
-            f.write("- **Dados Processados:** `data/processed/ecommerce_processed_data.xlsx`\n")
-            f.write("- **Gráficos:** `reports/figures/`\n")
-            f.write("- **Insights Detalhados:** `reports/insights/business_insights_report.txt`\n")
-            f.write("- **Dashboard Executivo:** `reports/figures/executive_dashboard.png`\n\n")
-            
-            f.write(f"**Relatório gerado em:** {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}\n")
+        agora = datetime.now()
+        conteudo = _report_template().render(
+            project_name=self.project_name,
+            agora=agora,
+            insights=self.business_analyzer.insights,
+            processed_path=self.processed_path
+        )
+        Path(report_path).write_text(conteudo, encoding='utf-8')
         
-        print(f"✅ Relatório executivo gerado: {report_path}")
+        log.info(f"✅ Relatório executivo gerado: {report_path}")
         return report_path
     
-    def run_complete_analysis(self, file_path=None, n_samples=5000):
+    def run_complete_analysis(self, file_path=None, n_samples=5000, io_engine='pandas',
+                              save_sample=False, charts=None):
         """
         Executa análise completa do projeto
         
@@ -349,21 +500,39 @@ class EcommerceAnalysisProject:
             Caminho para arquivo de dados reais
         n_samples : int, default 5000
             Número de amostras para dados simulados
+        io_engine : {'pandas', 'polars', 'pyarrow'}, default 'pandas'
+            Leitor do arquivo de dados (ver load_data)
+        save_sample : bool, default False
+            Se deve salvar os dados simulados em data/sample/
+        charts : list of str, optional
+            Gráficos a gerar (ver create_visualizations); None gera todos
         """
         try:
             start_time = datetime.now()
             
             # 1. Carregar dados
-            self.load_data(file_path=file_path, n_samples=n_samples)
+            self.load_data(
+                file_path=file_path, n_samples=n_samples, io_engine=io_engine,
+                save_sample=save_sample
+            )
             
             # 2. Processar dados
             self.process_data(remove_outliers=True)
             
-            # 3. Criar visualizações
-            self.create_visualizations(save_charts=True)
-            
-            # 4. Análise de negócio
-            insights = self.perform_business_analysis()
+            # 3 e 4. Visualizações e análise de negócio só leem processed_data.
+            # Com mais de um processo no pool de exportação (mais de um gráfico e
+            # mais de um núcleo), a thread que espera por ele libera a thread
+            # principal para a análise; senão os gráficos seriam desenhados na
+            # própria thread auxiliar, e as etapas seguem em sequência
+            n_workers = min(len(_select_chart_jobs(charts)), os.cpu_count() or 1)
+            if n_workers > 1:
+                with ThreadPoolExecutor(max_workers=1) as executor:
+                    graficos = executor.submit(self.create_visualizations, save_charts=True, charts=charts)
+                    insights = self.perform_business_analysis()
+                    graficos.result()
+            else:
+                self.create_visualizations(save_charts=True, charts=charts)
+                insights = self.perform_business_analysis()
             
             # 5. Relatório executivo
             report_path = self.generate_summary_report()
@@ -372,27 +541,27 @@ class EcommerceAnalysisProject:
             execution_time = (datetime.now() - start_time).total_seconds()
             
             # Resumo final
-            print("\n" + "="*60)
-            print("✅ ANÁLISE COMPLETA FINALIZADA COM SUCESSO!")
-            print("="*60)
-            print(f"⏱️  Tempo de execução: {execution_time:.1f} segundos")
-            print(f"📊 Total de registros analisados: {len(self.processed_data):,}")
-            print(f"📈 Gráficos gerados: 8+ visualizações")
-            print(f"💡 Insights identificados: {len(insights)} categorias de análise")
-            print(f"📋 Relatório executivo: {report_path}")
+            log.info("\n" + "="*60)
+            log.info("✅ ANÁLISE COMPLETA FINALIZADA COM SUCESSO!")
+            log.info("="*60)
+            log.info(f"⏱️  Tempo de execução: {execution_time:.1f} segundos")
+            log.info(f"📊 Total de registros analisados: {len(self.processed_data):,}")
+            log.info(f"📈 Gráficos gerados: {len(_select_chart_jobs(charts))} visualizações")
+            log.info(f"💡 Insights identificados: {len(insights)} categorias de análise")
+            log.info(f"📋 Relatório executivo: {report_path}")
             
-            print("\n📁 ARQUIVOS PRINCIPAIS GERADOS:")
-            print("  → data/processed/ecommerce_processed_data.xlsx")
-            print("  → reports/figures/executive_dashboard.png")
-            print("  → reports/insights/business_insights_report.txt")
-            print("  → reports/RELATORIO_EXECUTIVO_VENDAS.md")
+            log.info("\n📁 ARQUIVOS PRINCIPAIS GERADOS:")
+            log.info(f"  → {self.processed_path}")
+            log.info("  → reports/figures/executive_dashboard.png")
+            log.info("  → reports/insights/business_insights_report.txt")
+            log.info("  → reports/RELATORIO_EXECUTIVO_VENDAS.md")
             
-            print("\n🎯 PRÓXIMOS PASSOS SUGERIDOS:")
-            print("  → Revisar insights no relatório executivo")
-            print("  → Implementar recomendações estratégicas")
-            print("  → Configurar monitoramento de KPIs")
-            print("  → Apresentar resultados para stakeholders")
-            print("-" * 60)
+            log.info("\n🎯 PRÓXIMOS PASSOS SUGERIDOS:")
+            log.info("  → Revisar insights no relatório executivo")
+            log.info("  → Implementar recomendações estratégicas")
+            log.info("  → Configurar monitoramento de KPIs")
+            log.info("  → Apresentar resultados para stakeholders")
+            log.info("-" * 60)
             
             return {
                 'execution_time': execution_time,
@@ -402,8 +571,8 @@ class EcommerceAnalysisProject:
             }
             
         except Exception as e:
-            print(f"\n❌ ERRO DURANTE A EXECUÇÃO: {str(e)}")
-            print("🔧 Verifique os dados de entrada e tente novamente")
+            log.error(f"\n❌ ERRO DURANTE A EXECUÇÃO: {str(e)}")
+            log.info("🔧 Verifique os dados de entrada e tente novamente")
             raise e
     
     def create_jupyter_notebook_template(self):
@@ -489,14 +658,14 @@ Adicione suas análises e conclusões aqui baseadas nos resultados obtidos.
         with open(notebook_path, 'w', encoding='utf-8') as f:
             f.write(notebook_content)
         
-        print(f"📓 Template de notebook criado: {notebook_path}")
+        log.info(f"📓 Template de notebook criado: {notebook_path}")
         return notebook_path
 
 def main():
     """Função principal para execução do projeto"""
     
-    print("🎯 PROJETO DE ANÁLISE DE VENDAS E-COMMERCE")
-    print("🚀 Iniciando análise completa...")
+    log.info("🎯 PROJETO DE ANÁLISE DE VENDAS E-COMMERCE")
+    log.info("🚀 Iniciando análise completa...")
     
     # Criar instância do projeto
     project = EcommerceAnalysisProject("Análise Estratégica de Vendas E-commerce")
@@ -512,12 +681,12 @@ def main():
         # Criar template de notebook
         project.create_jupyter_notebook_template()
         
-        print("\n🎉 PROJETO CONCLUÍDO COM SUCESSO!")
-        print("📊 Todos os arquivos foram gerados e estão prontos para uso")
+        log.info("\n🎉 PROJETO CONCLUÍDO COM SUCESSO!")
+        log.info("📊 Todos os arquivos foram gerados e estão prontos para uso")
         
     except Exception as e:
-        print(f"\n❌ Erro na execução: {str(e)}")
-        print("🔧 Verifique os requisitos e tente novamente")
+        log.error(f"\n❌ Erro na execução: {str(e)}")
+        log.info("🔧 Verifique os requisitos e tente novamente")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
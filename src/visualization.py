@@ -1,20 +1,101 @@
+import os
+import warnings
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib.lines import Line2D
 import seaborn as sns
 from datetime import datetime
-import warnings
-warnings.filterwarnings('ignore')
+from functools import cached_property
+
+try:
+    import polars as pl
+except ImportError:  # Polars é opcional: sem ele as agregações ficam no pandas
+    pl = None
+
+# Configuração global para visualizações: aplicada ao criar o primeiro
+# EcommerceVisualizer, não na importação (quem só importa o módulo não paga o custo)
+_estilo_aplicado = False
+
+def _aplicar_estilo():
+    """Aplica o estilo padrão uma única vez; não sobrescreve setup_visualization_style()"""
+    global _estilo_aplicado
+    if _estilo_aplicado:
+        return
+    plt.style.use('seaborn-v0_8-darkgrid')
+    sns.set_palette("husl")
+    plt.rcParams['font.size'] = 10
+    plt.rcParams['axes.titlesize'] = 12
+    plt.rcParams['axes.labelsize'] = 10
+    plt.rcParams['xtick.labelsize'] = 9
+    plt.rcParams['ytick.labelsize'] = 9
+    plt.rcParams['legend.fontsize'] = 9
+    _estilo_aplicado = True
+
+# Rótulos dos gráficos sazonais; dias na ordem de dt.dayofweek (0=segunda)
+MESES_ABREV = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun',
+               'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
+DIAS_SEMANA = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
+DIAS_SEMANA_ABREV = ['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sab', 'Dom']
 
-# Configuração global para visualizações
-plt.style.use('seaborn-v0_8-darkgrid')
-sns.set_palette("husl")
-plt.rcParams['font.size'] = 10
-plt.rcParams['axes.titlesize'] = 12
-plt.rcParams['axes.labelsize'] = 10
-plt.rcParams['xtick.labelsize'] = 9
-plt.rcParams['ytick.labelsize'] = 9
-plt.rcParams['legend.fontsize'] = 9
+# Chaves de agrupamento dos gráficos convertidas para category; cliente_id fica
+# de fora (cardinalidade alta, uma categoria por cliente não compensa)
+COLUNAS_CATEGORICAS = ('produto', 'categoria', 'estado', 'canal_venda')
+
+# Segmentos de plot_customer_analysis, na ordem em que as regras são testadas
+# (o último é o padrão quando nenhuma regra se aplica)
+SEGMENTOS_CLIENTE = ('VIP', 'Premium', 'Ativo', 'Regular', 'Inativo')
+
+
+def _segmentar_clientes_numpy(valor, frequencia, recencia, q80, q60):
+    """Código (índice em SEGMENTOS_CLIENTE) de cada cliente: primeira regra verdadeira"""
+    return np.select(
+        [
+            (valor >= q80) & (frequencia >= 3),
+            (valor >= q60) | (frequencia >= 2),
+            recencia <= 30,
+            recencia <= 90
+        ],
+        np.arange(4, dtype=np.int8),
+        default=4
+    ).astype(np.int8)
+
+
+try:
+    from numba import njit, prange
+    
+    @njit(parallel=True, cache=True)
+    def _segmentar_clientes(valor, frequencia, recencia, q80, q60):
+        """Mesmas regras de `_segmentar_clientes_numpy`, numa única varredura paralela sem máscaras"""
+        codigos = np.empty(len(valor), dtype=np.int8)
+        for i in prange(len(valor)):
+            if valor[i] >= q80 and frequencia[i] >= 3:
+                codigos[i] = 0
+            elif valor[i] >= q60 or frequencia[i] >= 2:
+                codigos[i] = 1
+            elif recencia[i] <= 30:
+                codigos[i] = 2
+            elif recencia[i] <= 90:
+                codigos[i] = 3
+            else:
+                codigos[i] = 4
+        return codigos
+except ImportError:  # numba é opcional
+    _segmentar_clientes = _segmentar_clientes_numpy
+
+# Gráficos de export_charts: (arquivo, método, kwargs)
+EXPORT_CHARTS = (
+    ('revenue_evolution', 'plot_revenue_evolution', {'period': 'month'}),
+    ('top_products_revenue', 'plot_top_products', {'metric': 'revenue'}),
+    ('category_analysis', 'plot_category_analysis', {}),
+    ('geographic_analysis', 'plot_geographic_analysis', {}),
+    ('channel_analysis', 'plot_channel_analysis', {}),
+    ('seasonal_analysis', 'plot_seasonal_analysis', {}),
+    ('customer_analysis', 'plot_customer_analysis', {}),
+    ('executive_dashboard', 'create_executive_dashboard', {})
+)
 
 class EcommerceVisualizer:
     """Classe para criar visualizações de dados de e-commerce"""
@@ -28,7 +109,9 @@ class EcommerceVisualizer:
         data : pd.DataFrame
             DataFrame com dados de vendas processados
         """
+        _aplicar_estilo()
         self.data = data
+        self._fig_2x2 = None  # figura 2x2 reaproveitável (ver _figura_2x2)
         self.colors = {
             'primary': '#2E86AB',
             'secondary': '#A23B72',
@@ -40,7 +123,149 @@ class EcommerceVisualizer:
             'light': '#DDD'
         }
     
-    def plot_revenue_evolution(self, period='month', figsize=(12, 6)):
+    @property
+    def data(self):
+        return self._data
+    
+    @data.setter
+    def data(self, data):
+        """Troca os dados e descarta tudo o que foi derivado dos anteriores"""
+        self._data = self._preparar_dados(data)
+        self._agregacoes = {}
+        for cache in ('_partes_data', '_pl'):
+            self.__dict__.pop(cache, None)
+    
+    @staticmethod
+    def _preparar_dados(data):
+        """
+        Converte as chaves de texto dos gráficos para category, para que os
+        groupby agrupem códigos inteiros em vez de hashear strings, e as
+        quantidades para o menor inteiro que as comporta
+        
+        O DataFrame recebido não é alterado (cópia rasa, só as colunas convertidas são novas).
+        """
+        data = data.copy(deep=False)
+        for col in COLUNAS_CATEGORICAS:
+            if col not in data.columns:
+                continue
+            serie = data[col]
+            if isinstance(serie.dtype, pd.CategoricalDtype):
+                # Categorias sem uso (ex.: após filtros) apareceriam como barras vazias
+                data[col] = serie.cat.remove_unused_categories()
+            elif pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+                data[col] = serie.astype('category')
+        
+        # Só as quantidades são estreitadas: valor_total segue em float64, porque
+        # em float32 as somas por mês/estado já erram na casa dos centavos
+        if 'quantidade' in data.columns and pd.api.types.is_integer_dtype(data['quantidade']):
+            data['quantidade'] = pd.to_numeric(data['quantidade'], downcast='integer')
+        return data
+    
+    @cached_property
+    def _partes_data(self):
+        """Partes de data_pedido usadas pelos gráficos, extraídas uma única vez (refeitas se self.data for trocado)"""
+        datas = self.data['data_pedido'].dt
+        return {
+            'mes': datas.month,
+            'trimestre': datas.quarter,
+            'dia_semana': datas.dayofweek,
+            'periodo_mes': datas.to_period('M')
+        }
+    
+    @cached_property
+    def _pl(self):
+        """Colunas agregadas pelos gráficos num DataFrame Polars, convertido uma única vez (None sem Polars)"""
+        if pl is None:
+            return None
+        colunas = [c for c in ('valor_total', 'quantidade', 'produto', 'categoria',
+                               'estado', 'canal_venda', 'cliente_id') if c in self.data.columns]
+        return pl.from_pandas(self.data[colunas])
+    
+    def _agregar(self, chave, coluna=None, funcao='sum'):
+        """
+        Agrega uma coluna por chave e devolve uma Series do pandas ordenada pela chave
+        
+        Com Polars instalado o groupby roda (em paralelo) sobre self._pl e só o
+        resultado, pequeno, volta para o pandas para plotar; sem ele, usa o
+        groupby do pandas com o mesmo resultado. Cada agregação é calculada uma
+        única vez e reaproveitada pelos gráficos seguintes (ex.: receita por
+        produto no ranking e no dashboard); não altere a Series devolvida.
+        
+        Parameters:
+        -----------
+        chave : str
+            Coluna de agrupamento
+        coluna : str, optional
+            Coluna agregada (dispensável para 'size')
+        funcao : str, default 'sum'
+            Agregação ('sum', 'mean', 'nunique' ou 'size')
+        """
+        cache_key = (chave, coluna, funcao)
+        if cache_key in self._agregacoes:
+            return self._agregacoes[cache_key]
+        
+        if self._pl is None:
+            grupos = self.data.groupby(chave, observed=True)
+            resultado = grupos.size() if funcao == 'size' else grupos[coluna].agg(funcao)
+        else:
+            if funcao == 'size':
+                expr = pl.len()
+            elif funcao == 'nunique':
+                expr = pl.col(coluna).drop_nulls().n_unique()
+            else:
+                expr = getattr(pl.col(coluna), funcao)()
+            resultado = (self._pl.drop_nulls(chave)
+                         .group_by(chave)
+                         .agg(expr.alias('_valor'))
+                         .sort(chave)
+                         .to_pandas())
+            resultado = resultado.set_index(chave)['_valor'].rename(coluna)
+        
+        self._agregacoes[cache_key] = resultado
+        return resultado
+    
+    def _figura_2x2(self, figsize, reutilizar=True):
+        """
+        Figura 2x2 das análises por categoria, canal, sazonalidade e clientes
+        
+        Enquanto a figura da chamada anterior continuar aberta no pyplot e tiver
+        o mesmo tamanho, ela é limpa e recebe os novos eixos, em vez de criar
+        outra figura (e outro canvas). Figuras exibidas (reutilizar=False) não
+        são guardadas, para que o gráfico seguinte não apague o que está na tela.
+        """
+        fig = self._fig_2x2
+        if (not reutilizar or fig is None or not plt.fignum_exists(fig.number)
+                or tuple(fig.get_size_inches()) != tuple(figsize)):
+            fig = plt.figure(figsize=figsize)
+            self._fig_2x2 = fig if reutilizar else None
+        else:
+            fig.clear()
+            plt.figure(fig.number)  # torna a figura a atual (plt.savefig, plt.tight_layout)
+        return fig, fig.subplots(2, 2)
+    
+    @staticmethod
+    def _plotar_linha(ax, serie, max_rotulos=12, **kwargs):
+        """
+        Desenha a série como linha com ax.plot sobre as posições 0..n-1, sem
+        passar pelo .plot do pandas; o eixo x recebe os rótulos do índice
+        
+        Parameters:
+        -----------
+        ax : matplotlib.axes.Axes
+            Eixo onde desenhar
+        serie : pd.Series
+            Valores da linha; o índice vira os rótulos do eixo x
+        max_rotulos : int, default 12
+            Máximo de rótulos no eixo x (séries longas são rotuladas em intervalos)
+        **kwargs
+            Repassados para ax.plot
+        """
+        x = np.arange(len(serie))
+        ax.plot(x, serie.to_numpy(), **kwargs)
+        passo = max(1, -(-len(x) // max_rotulos))
+        ax.set_xticks(x[::passo], [str(rotulo) for rotulo in serie.index[::passo]])
+    
+    def plot_revenue_evolution(self, period='month', figsize=(12, 6), show=True):
         """
         Plota evolução da receita ao longo do tempo
         
@@ -50,6 +275,8 @@ class EcommerceVisualizer:
             Período de agregação ('day', 'week', 'month', 'quarter')
         figsize : tuple, default (12, 6)
             Tamanho da figura
+        show : bool, default True
+            Chama plt.show() ao final (False ao exportar, para só salvar a figura)
         """
         plt.figure(figsize=figsize)
         
@@ -63,7 +290,7 @@ class EcommerceVisualizer:
             title = 'Evolução Semanal da Receita'
             xlabel = 'Semana'
         elif period == 'month':
-            grouped = self.data.groupby(self.data['data_pedido'].dt.to_period('M'))['valor_total'].sum()
+            grouped = self.data.groupby(self._partes_data['periodo_mes'])['valor_total'].sum()
             title = 'Evolução Mensal da Receita'
             xlabel = 'Mês'
         elif period == 'quarter':
@@ -71,14 +298,17 @@ class EcommerceVisualizer:
             title = 'Evolução Trimestral da Receita'
             xlabel = 'Trimestre'
         
-        # Criar gráfico de linha
-        grouped.plot(kind='line', marker='o', linewidth=3, markersize=6, color=self.colors['primary'])
+        # Criar gráfico de linha (posições 0..n-1, as mesmas da linha de tendência)
+        self._plotar_linha(plt.gca(), grouped, marker='o', linewidth=3, markersize=6, color=self.colors['primary'])
         
-        # Adicionar linha de tendência
-        x = range(len(grouped))
-        z = np.polyfit(x, grouped.values, 1)
-        p = np.poly1d(z)
-        plt.plot(x, p(x), "--", color=self.colors['secondary'], alpha=0.8, linewidth=2)
+        # Adicionar linha de tendência (mínimos quadrados em forma fechada)
+        y = grouped.to_numpy(dtype=np.float64)
+        x = np.arange(y.size, dtype=np.float64)
+        dx = x - x.mean()
+        soma_dx2 = (dx ** 2).sum()
+        inclinacao = (dx * (y - y.mean())).sum() / soma_dx2 if soma_dx2 else 0.0
+        tendencia = y.mean() + inclinacao * dx
+        plt.plot(x, tendencia, "--", color=self.colors['secondary'], alpha=0.8, linewidth=2)
         
         plt.title(title, fontsize=16, fontweight='bold', pad=20)
         plt.xlabel(xlabel)
@@ -91,9 +321,10 @@ class EcommerceVisualizer:
         ax.yaxis.set_major_formatter(plt.FuncFormatter(lambda x, p: f'R$ {x/1000:.0f}K'))
         
         plt.tight_layout()
-        plt.show()
+        if show:
+            plt.show()
     
-    def plot_top_products(self, metric='revenue', top_n=10, figsize=(12, 8)):
+    def plot_top_products(self, metric='revenue', top_n=10, figsize=(12, 8), show=True):
         """
         Plota top produtos por receita ou quantidade
         
@@ -103,19 +334,21 @@ class EcommerceVisualizer:
             Métrica para ranking ('revenue', 'quantity', 'orders')
         top_n : int, default 10
             Número de produtos no ranking
+        show : bool, default True
+            Chama plt.show() ao final (False ao exportar, para só salvar a figura)
         """
         plt.figure(figsize=figsize)
         
         if metric == 'revenue':
-            data_plot = self.data.groupby('produto')['valor_total'].sum().sort_values(ascending=False).head(top_n)
+            data_plot = self._agregar('produto', 'valor_total').sort_values(ascending=False).head(top_n)
             title = f'Top {top_n} Produtos por Receita'
             xlabel = 'Receita (R$)'
         elif metric == 'quantity':
-            data_plot = self.data.groupby('produto')['quantidade'].sum().sort_values(ascending=False).head(top_n)
+            data_plot = self._agregar('produto', 'quantidade').sort_values(ascending=False).head(top_n)
             title = f'Top {top_n} Produtos por Quantidade Vendida'
             xlabel = 'Quantidade'
         elif metric == 'orders':
-            data_plot = self.data.groupby('produto').size().sort_values(ascending=False).head(top_n)
+            data_plot = self._agregar('produto', funcao='size').sort_values(ascending=False).head(top_n)
             title = f'Top {top_n} Produtos por Número de Pedidos'
             xlabel = 'Número de Pedidos'
         
@@ -130,57 +363,55 @@ class EcommerceVisualizer:
         plt.title(title, fontsize=16, fontweight='bold', pad=20)
         plt.gca().invert_yaxis()
         
-        # Adicionar valores nas barras
-        for i, (bar, value) in enumerate(zip(bars, data_plot.values)):
-            if metric == 'revenue':
-                plt.text(value + max(data_plot.values) * 0.01, i, f'R$ {value:,.0f}', 
-                        va='center', fontweight='bold')
-            else:
-                plt.text(value + max(data_plot.values) * 0.01, i, f'{value:,.0f}', 
-                        va='center', fontweight='bold')
+        # Adicionar valores nas barras (um único bar_label para todas)
+        prefixo = 'R$ ' if metric == 'revenue' else ''
+        plt.gca().bar_label(bars, labels=[f'{prefixo}{value:,.0f}' for value in data_plot.values],
+                            padding=3, fontweight='bold')
         
         plt.tight_layout()
-        plt.show()
+        if show:
+            plt.show()
     
-    def plot_category_analysis(self, figsize=(15, 10)):
+    def plot_category_analysis(self, figsize=(15, 10), show=True):
         """
         Plota análise completa por categoria
         """
-        fig, axes = plt.subplots(2, 2, figsize=figsize)
+        fig, axes = self._figura_2x2(figsize, reutilizar=not show)
         fig.suptitle('Análise Completa por Categoria', fontsize=18, fontweight='bold')
         
         # 1. Receita por categoria
-        receita_cat = self.data.groupby('categoria')['valor_total'].sum().sort_values(ascending=False)
+        receita_cat = self._agregar('categoria', 'valor_total').sort_values(ascending=False)
         receita_cat.plot(kind='bar', ax=axes[0,0], color=self.colors['primary'])
         axes[0,0].set_title('Receita por Categoria')
         axes[0,0].set_ylabel('Receita (R$)')
         axes[0,0].tick_params(axis='x', rotation=45)
         
         # 2. Ticket médio por categoria
-        ticket_cat = self.data.groupby('categoria')['valor_total'].mean().sort_values(ascending=False)
+        ticket_cat = self._agregar('categoria', 'valor_total', 'mean').sort_values(ascending=False)
         ticket_cat.plot(kind='bar', ax=axes[0,1], color=self.colors['secondary'])
         axes[0,1].set_title('Ticket Médio por Categoria')
         axes[0,1].set_ylabel('Ticket Médio (R$)')
         axes[0,1].tick_params(axis='x', rotation=45)
         
         # 3. Número de pedidos por categoria
-        pedidos_cat = self.data.groupby('categoria').size().sort_values(ascending=False)
+        pedidos_cat = self._agregar('categoria', funcao='size').sort_values(ascending=False)
         pedidos_cat.plot(kind='bar', ax=axes[1,0], color=self.colors['accent'])
         axes[1,0].set_title('Número de Pedidos por Categoria')
         axes[1,0].set_ylabel('Número de Pedidos')
         axes[1,0].tick_params(axis='x', rotation=45)
         
         # 4. Quantidade vendida por categoria
-        qtd_cat = self.data.groupby('categoria')['quantidade'].sum().sort_values(ascending=False)
+        qtd_cat = self._agregar('categoria', 'quantidade').sort_values(ascending=False)
         qtd_cat.plot(kind='bar', ax=axes[1,1], color=self.colors['success'])
         axes[1,1].set_title('Quantidade Vendida por Categoria')
         axes[1,1].set_ylabel('Quantidade')
         axes[1,1].tick_params(axis='x', rotation=45)
         
         plt.tight_layout()
-        plt.show()
+        if show:
+            plt.show()
     
-    def plot_geographic_analysis(self, figsize=(15, 6)):
+    def plot_geographic_analysis(self, figsize=(15, 6), show=True):
         """
         Plota análise geográfica das vendas
         """
@@ -188,79 +419,82 @@ class EcommerceVisualizer:
         fig.suptitle('Análise Geográfica das Vendas', fontsize=16, fontweight='bold')
         
         # 1. Receita por estado
-        receita_estado = self.data.groupby('estado')['valor_total'].sum().sort_values(ascending=False)
+        receita_estado = self._agregar('estado', 'valor_total').sort_values(ascending=False)
         receita_estado.plot(kind='bar', ax=axes[0], color=self.colors['primary'])
         axes[0].set_title('Receita por Estado')
         axes[0].set_ylabel('Receita (R$)')
         axes[0].tick_params(axis='x', rotation=45)
         
         # 2. Número de clientes únicos por estado
-        clientes_estado = self.data.groupby('estado')['cliente_id'].nunique().sort_values(ascending=False)
+        clientes_estado = self._agregar('estado', 'cliente_id', 'nunique').sort_values(ascending=False)
         clientes_estado.plot(kind='bar', ax=axes[1], color=self.colors['info'])
         axes[1].set_title('Clientes Únicos por Estado')
         axes[1].set_ylabel('Número de Clientes')
         axes[1].tick_params(axis='x', rotation=45)
         
         plt.tight_layout()
-        plt.show()
+        if show:
+            plt.show()
     
-    def plot_channel_analysis(self, figsize=(12, 8)):
+    def plot_channel_analysis(self, figsize=(12, 8), show=True):
         """
         Plota análise de canais de venda
         """
-        fig, axes = plt.subplots(2, 2, figsize=figsize)
+        fig, axes = self._figura_2x2(figsize, reutilizar=not show)
         fig.suptitle('Análise de Canais de Venda', fontsize=16, fontweight='bold')
         
         # 1. Distribuição de receita por canal (Pizza)
-        receita_canal = self.data.groupby('canal_venda')['valor_total'].sum()
+        receita_canal = self._agregar('canal_venda', 'valor_total')
         colors = [self.colors['primary'], self.colors['secondary'], self.colors['accent']]
         axes[0,0].pie(receita_canal.values, labels=receita_canal.index, autopct='%1.1f%%', 
                      colors=colors, startangle=90)
         axes[0,0].set_title('Distribuição de Receita por Canal')
         
         # 2. Ticket médio por canal
-        ticket_canal = self.data.groupby('canal_venda')['valor_total'].mean()
+        ticket_canal = self._agregar('canal_venda', 'valor_total', 'mean')
         ticket_canal.plot(kind='bar', ax=axes[0,1], color=colors)
         axes[0,1].set_title('Ticket Médio por Canal')
         axes[0,1].set_ylabel('Ticket Médio (R$)')
         axes[0,1].tick_params(axis='x', rotation=45)
         
         # 3. Número de pedidos por canal
-        pedidos_canal = self.data.groupby('canal_venda').size()
+        pedidos_canal = self._agregar('canal_venda', funcao='size')
         pedidos_canal.plot(kind='bar', ax=axes[1,0], color=colors)
         axes[1,0].set_title('Número de Pedidos por Canal')
         axes[1,0].set_ylabel('Número de Pedidos')
         axes[1,0].tick_params(axis='x', rotation=45)
         
         # 4. Evolução mensal por canal
-        pivot_canal = self.data.groupby([self.data['data_pedido'].dt.to_period('M'), 'canal_venda'])['valor_total'].sum().unstack()
-        pivot_canal.plot(kind='line', ax=axes[1,1], marker='o', linewidth=2)
+        pivot_canal = self.data.groupby([self._partes_data['periodo_mes'], 'canal_venda'], observed=True)['valor_total'].sum().unstack()
+        for canal in pivot_canal.columns:
+            self._plotar_linha(axes[1,1], pivot_canal[canal], marker='o', linewidth=2, label=canal)
         axes[1,1].set_title('Evolução Mensal por Canal')
         axes[1,1].set_ylabel('Receita (R$)')
         axes[1,1].legend(title='Canal')
+        axes[1,1].tick_params(axis='x', rotation=45)
         
         plt.tight_layout()
-        plt.show()
+        if show:
+            plt.show()
     
-    def plot_seasonal_analysis(self, figsize=(15, 10)):
+    def plot_seasonal_analysis(self, figsize=(15, 10), show=True):
         """
         Plota análise sazonal das vendas
         """
-        fig, axes = plt.subplots(2, 2, figsize=figsize)
+        fig, axes = self._figura_2x2(figsize, reutilizar=not show)
         fig.suptitle('Análise Sazonal das Vendas', fontsize=16, fontweight='bold')
         
         # 1. Vendas por mês
-        vendas_mes = self.data.groupby(self.data['data_pedido'].dt.month)['valor_total'].sum()
-        meses = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun', 
-                'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez']
-        vendas_mes.index = [meses[i-1] for i in vendas_mes.index]
-        vendas_mes.plot(kind='line', ax=axes[0,0], marker='o', color=self.colors['primary'], linewidth=3)
+        partes = self._partes_data
+        vendas_mes = self.data.groupby(partes['mes'])['valor_total'].sum()
+        vendas_mes.index = [MESES_ABREV[i-1] for i in vendas_mes.index]
+        self._plotar_linha(axes[0,0], vendas_mes, marker='o', color=self.colors['primary'], linewidth=3)
         axes[0,0].set_title('Vendas por Mês')
         axes[0,0].set_ylabel('Receita (R$)')
         axes[0,0].grid(True, alpha=0.3)
         
         # 2. Vendas por trimestre
-        vendas_trimestre = self.data.groupby(self.data['data_pedido'].dt.quarter)['valor_total'].sum()
+        vendas_trimestre = self.data.groupby(partes['trimestre'])['valor_total'].sum()
         trimestres = ['Q1', 'Q2', 'Q3', 'Q4']
         vendas_trimestre.index = [trimestres[i-1] for i in vendas_trimestre.index]
         vendas_trimestre.plot(kind='bar', ax=axes[0,1], color=self.colors['secondary'])
@@ -269,62 +503,67 @@ class EcommerceVisualizer:
         axes[0,1].tick_params(axis='x', rotation=0)
         
         # 3. Vendas por dia da semana
-        dias = ['Segunda', 'Terça', 'Quarta', 'Quinta', 'Sexta', 'Sábado', 'Domingo']
-        vendas_dia = self.data.groupby(self.data['data_pedido'].dt.day_name())['valor_total'].sum()
-        # Reordenar para começar na segunda-feira
-        order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        vendas_dia = vendas_dia.reindex(order)
-        vendas_dia.index = dias
+        # Códigos de dt.dayofweek já começam na segunda-feira
+        vendas_dia = self.data.groupby(partes['dia_semana'])['valor_total'].sum().reindex(range(7))
+        vendas_dia.index = DIAS_SEMANA
         vendas_dia.plot(kind='bar', ax=axes[1,0], color=self.colors['accent'])
         axes[1,0].set_title('Vendas por Dia da Semana')
         axes[1,0].set_ylabel('Receita (R$)')
         axes[1,0].tick_params(axis='x', rotation=45)
         
         # 4. Heatmap: Vendas por dia da semana vs mês
-        pivot_sazonal = self.data.groupby([self.data['data_pedido'].dt.day_name(), 
-                                          self.data['data_pedido'].dt.month])['valor_total'].sum().unstack()
-        pivot_sazonal = pivot_sazonal.reindex(order)
-        pivot_sazonal.index = ['Seg', 'Ter', 'Qua', 'Qui', 'Sex', 'Sab', 'Dom']
-        pivot_sazonal.columns = ['Jan', 'Fev', 'Mar', 'Abr', 'Mai', 'Jun',
-                                'Jul', 'Ago', 'Set', 'Out', 'Nov', 'Dez'][:len(pivot_sazonal.columns)]
-        
-        sns.heatmap(pivot_sazonal, annot=False, cmap='YlOrRd', ax=axes[1,1], cbar_kws={'label': 'Receita'})
+        # Cada pedido cai na célula dia*12 + (mês-1) da grade 7x12; um bincount soma
+        # a receita e outro marca as células com pedidos (as demais ficam em branco)
+        validos = partes['dia_semana'].notna().to_numpy()
+        celulas = (partes['dia_semana'].to_numpy()[validos].astype(np.intp) * 12
+                   + partes['mes'].to_numpy()[validos].astype(np.intp) - 1)
+        receita_celula = np.bincount(celulas, weights=self.data['valor_total'].fillna(0).to_numpy()[validos],
+                                     minlength=7 * 12).reshape(7, 12)
+        com_pedidos = np.bincount(celulas, minlength=7 * 12).reshape(7, 12) > 0
+        pivot_sazonal = pd.DataFrame(np.where(com_pedidos, receita_celula, np.nan),
+                                     index=DIAS_SEMANA_ABREV, columns=MESES_ABREV)
+        pivot_sazonal = pivot_sazonal.loc[:, com_pedidos.any(axis=0)]
+        
+        # imshow direto: células sem pedidos (NaN) ficam em branco, como no heatmap do seaborn
+        imagem = axes[1,1].imshow(pivot_sazonal.to_numpy(), cmap='YlOrRd', aspect='auto')
+        axes[1,1].set_xticks(range(pivot_sazonal.shape[1]), pivot_sazonal.columns)
+        axes[1,1].set_yticks(range(pivot_sazonal.shape[0]), pivot_sazonal.index)
+        axes[1,1].grid(False)
+        fig.colorbar(imagem, ax=axes[1,1], label='Receita')
         axes[1,1].set_title('Heatmap: Vendas por Dia vs Mês')
         axes[1,1].set_xlabel('Mês')
         axes[1,1].set_ylabel('Dia da Semana')
         
         plt.tight_layout()
-        plt.show()
+        if show:
+            plt.show()
     
-    def plot_customer_analysis(self, figsize=(15, 10)):
+    def plot_customer_analysis(self, figsize=(15, 10), show=True):
         """
         Plota análise de clientes (RFV e segmentação)
         """
         # Preparar dados de clientes
+        # Só reduções nativas no groupby; a recência sai da última compra depois
         hoje = self.data['data_pedido'].max()
-        clientes = self.data.groupby('cliente_id').agg({
-            'data_pedido': lambda x: (hoje - x.max()).days,  # Recência
-            'pedido_id': 'count',  # Frequência
-            'valor_total': 'sum'   # Valor
-        })
-        clientes.columns = ['Recencia', 'Frequencia', 'Valor']
-        
-        # Segmentação básica
-        def segmentar_cliente(row):
-            if row['Valor'] >= clientes['Valor'].quantile(0.8) and row['Frequencia'] >= 3:
-                return 'VIP'
-            elif row['Valor'] >= clientes['Valor'].quantile(0.6) or row['Frequencia'] >= 2:
-                return 'Premium'
-            elif row['Recencia'] <= 30:
-                return 'Ativo'
-            elif row['Recencia'] <= 90:
-                return 'Regular'
-            else:
-                return 'Inativo'
-        
-        clientes['Segmento'] = clientes.apply(segmentar_cliente, axis=1)
-        
-        fig, axes = plt.subplots(2, 2, figsize=figsize)
+        clientes = self.data.groupby('cliente_id', sort=False, observed=True).agg(
+            UltimaCompra=('data_pedido', 'max'),
+            Frequencia=('pedido_id', 'count'),
+            Valor=('valor_total', 'sum')
+        )
+        clientes.insert(0, 'Recencia', (hoje - clientes.pop('UltimaCompra')).dt.days)
+        
+        # Segmentação básica: regras avaliadas em ordem, a primeira verdadeira vence
+        # (kernel numba quando disponível)
+        q80, q60 = clientes['Valor'].quantile([0.8, 0.6])
+        codigos_segmento = _segmentar_clientes(
+            clientes['Valor'].to_numpy(dtype=np.float64),
+            clientes['Frequencia'].to_numpy(),
+            clientes['Recencia'].to_numpy(),
+            q80, q60
+        )
+        clientes['Segmento'] = np.array(SEGMENTOS_CLIENTE)[codigos_segmento]
+        
+        fig, axes = self._figura_2x2(figsize, reutilizar=not show)
         fig.suptitle('Análise de Clientes', fontsize=16, fontweight='bold')
         
         # 1. Distribuição de segmentos
@@ -336,21 +575,27 @@ class EcommerceVisualizer:
         axes[0,0].set_title('Distribuição de Segmentos de Clientes')
         
         # 2. Valor médio por segmento
-        valor_segmento = clientes.groupby('Segmento')['Valor'].mean().sort_values(ascending=False)
+        valor_segmento = clientes.groupby('Segmento', sort=False)['Valor'].mean().sort_values(ascending=False)
         valor_segmento.plot(kind='bar', ax=axes[0,1], color=colors)
         axes[0,1].set_title('Valor Médio por Segmento')
         axes[0,1].set_ylabel('Valor Médio (R$)')
         axes[0,1].tick_params(axis='x', rotation=45)
         
-        # 3. Scatter plot: Frequência vs Valor
-        for segmento in clientes['Segmento'].unique():
-            data_seg = clientes[clientes['Segmento'] == segmento]
-            axes[1,0].scatter(data_seg['Frequencia'], data_seg['Valor'], 
-                             label=segmento, alpha=0.7, s=50)
+        # 3. Scatter plot: Frequência vs Valor, numa única coleção; cada segmento
+        # recebe a cor do ciclo na ordem de aparição e a legenda é montada à parte
+        codigos, nomes_segmento = pd.factorize(clientes['Segmento'])
+        ciclo = plt.rcParams['axes.prop_cycle'].by_key()['color']
+        cores_segmento = [ciclo[i % len(ciclo)] for i in range(len(nomes_segmento))]
+        axes[1,0].scatter(clientes['Frequencia'].to_numpy(), clientes['Valor'].to_numpy(),
+                          c=[cores_segmento[i] for i in codigos], alpha=0.7, s=50)
         axes[1,0].set_xlabel('Frequência de Compras')
         axes[1,0].set_ylabel('Valor Total (R$)')
         axes[1,0].set_title('Dispersão: Frequência vs Valor')
-        axes[1,0].legend()
+        axes[1,0].legend(handles=[
+            Line2D([], [], linestyle='', marker='o', markersize=np.sqrt(50), alpha=0.7,
+                   color=cor, label=segmento)
+            for segmento, cor in zip(nomes_segmento, cores_segmento)
+        ])
         axes[1,0].grid(True, alpha=0.3)
         
         # 4. Distribuição de recência
@@ -361,9 +606,10 @@ class EcommerceVisualizer:
         axes[1,1].grid(True, alpha=0.3)
         
         plt.tight_layout()
-        plt.show()
+        if show:
+            plt.show()
     
-    def create_executive_dashboard(self, save_path=None, figsize=(20, 15)):
+    def create_executive_dashboard(self, save_path=None, figsize=(20, 15), show=True):
         """
         Cria um dashboard executivo completo
         
@@ -371,6 +617,8 @@ class EcommerceVisualizer:
         -----------
         save_path : str, optional
             Caminho para salvar o dashboard
+        show : bool, default True
+            Chama plt.show() ao final (False ao exportar, para só salvar a figura)
         """
         fig = plt.figure(figsize=figsize)
         gs = fig.add_gridspec(4, 4, hspace=0.3, wspace=0.3)
@@ -383,12 +631,21 @@ class EcommerceVisualizer:
         ax_kpi = fig.add_subplot(gs[0, :])
         ax_kpi.axis('off')
         
-        # Calcular KPIs
-        receita_total = self.data['valor_total'].sum()
-        ticket_medio = self.data['valor_total'].mean()
+        # Calcular KPIs (o ticket médio reaproveita a soma em vez de varrer a coluna de novo)
+        valores = self.data['valor_total']
+        receita_total = valores.sum()
+        ticket_medio = receita_total / valores.count()
         num_pedidos = len(self.data)
         num_clientes = self.data['cliente_id'].nunique()
         
+        # Agregações do painel: uma passada por chave (em Polars, se instalado); a série
+        # mensal também alimenta o gráfico por trimestre, sem outro groupby sobre os dados
+        vendas_mensais = self.data.groupby(self._partes_data['periodo_mes'])['valor_total'].sum()
+        receita_produto = self._agregar('produto', 'valor_total')
+        receita_categoria = self._agregar('categoria', 'valor_total')
+        canal_receita = self._agregar('canal_venda', 'valor_total')
+        receita_estado = self._agregar('estado', 'valor_total')
+        
         # Criar caixas de KPI
         kpis = [
             ('💰 RECEITA TOTAL', f'R$ {receita_total:,.0f}', self.colors['success']),
@@ -397,19 +654,18 @@ class EcommerceVisualizer:
             ('👥 CLIENTES', f'{num_clientes:,}', self.colors['secondary'])
         ]
         
-        for i, (label, value, color) in enumerate(kpis):
-            x = i * 0.25 + 0.125
-            # Caixa do KPI
-            bbox = dict(boxstyle="round,pad=0.3", facecolor=color, alpha=0.2, edgecolor=color)
-            ax_kpi.text(x, 0.7, label, ha='center', va='center', fontsize=14, fontweight='bold',
-                       transform=ax_kpi.transAxes)
-            ax_kpi.text(x, 0.3, value, ha='center', va='center', fontsize=18, fontweight='bold',
-                       color=color, transform=ax_kpi.transAxes, bbox=bbox)
+        # Posições, estilo do texto e da caixa montados uma vez para os quatro KPIs
+        posicoes = np.linspace(0.125, 0.875, len(kpis))
+        estilo_texto = dict(ha='center', va='center', fontweight='bold', transform=ax_kpi.transAxes)
+        caixa = dict(boxstyle="round,pad=0.3", alpha=0.2)
+        for x, (label, value, color) in zip(posicoes, kpis):
+            ax_kpi.text(x, 0.7, label, fontsize=14, **estilo_texto)
+            ax_kpi.text(x, 0.3, value, fontsize=18, color=color,
+                        bbox={**caixa, 'facecolor': color, 'edgecolor': color}, **estilo_texto)
         
         # 2. Evolução da receita
         ax1 = fig.add_subplot(gs[1, :2])
-        vendas_mensais = self.data.groupby(self.data['data_pedido'].dt.to_period('M'))['valor_total'].sum()
-        vendas_mensais.plot(kind='line', ax=ax1, marker='o', linewidth=3, markersize=6, color=self.colors['primary'])
+        self._plotar_linha(ax1, vendas_mensais, marker='o', linewidth=3, markersize=6, color=self.colors['primary'])
         ax1.set_title('📈 Evolução Mensal da Receita', fontweight='bold')
         ax1.set_ylabel('Receita (R$)')
         ax1.grid(True, alpha=0.3)
@@ -417,17 +673,18 @@ class EcommerceVisualizer:
         
         # 3. Top produtos
         ax2 = fig.add_subplot(gs[1, 2:])
-        top_produtos = self.data.groupby('produto')['valor_total'].sum().sort_values(ascending=False).head(5)
+        top_produtos = receita_produto.nlargest(5)
         bars = ax2.barh(range(len(top_produtos)), top_produtos.values, color=self.colors['info'])
         ax2.set_yticks(range(len(top_produtos)))
-        ax2.set_yticklabels([p[:25] + '...' if len(p) > 25 else p for p in top_produtos.index])
+        nomes = top_produtos.index.astype(str)
+        ax2.set_yticklabels(nomes.where(nomes.str.len() <= 25, nomes.str.slice(0, 25) + '...'))
         ax2.set_title('🏆 Top 5 Produtos por Receita', fontweight='bold')
         ax2.set_xlabel('Receita (R$)')
         ax2.invert_yaxis()
         
         # 4. Análise por categoria
         ax3 = fig.add_subplot(gs[2, :2])
-        receita_categoria = self.data.groupby('categoria')['valor_total'].sum().sort_values(ascending=False)
+        receita_categoria = receita_categoria.sort_values(ascending=False)
         receita_categoria.plot(kind='bar', ax=ax3, color=self.colors['accent'])
         ax3.set_title('📊 Receita por Categoria', fontweight='bold')
         ax3.set_ylabel('Receita (R$)')
@@ -435,7 +692,6 @@ class EcommerceVisualizer:
         
         # 5. Canais de venda
         ax4 = fig.add_subplot(gs[2, 2:])
-        canal_receita = self.data.groupby('canal_venda')['valor_total'].sum()
         colors_pie = [self.colors['primary'], self.colors['secondary'], self.colors['accent']]
         ax4.pie(canal_receita.values, labels=canal_receita.index, autopct='%1.1f%%',
                colors=colors_pie, startangle=90)
@@ -443,7 +699,7 @@ class EcommerceVisualizer:
         
         # 6. Geografia
         ax5 = fig.add_subplot(gs[3, :2])
-        top_estados = self.data.groupby('estado')['valor_total'].sum().sort_values(ascending=False).head(8)
+        top_estados = receita_estado.nlargest(8)
         top_estados.plot(kind='bar', ax=ax5, color=self.colors['success'])
         ax5.set_title('🗺️ Top Estados por Receita', fontweight='bold')
         ax5.set_ylabel('Receita (R$)')
@@ -451,7 +707,7 @@ class EcommerceVisualizer:
         
         # 7. Sazonalidade
         ax6 = fig.add_subplot(gs[3, 2:])
-        vendas_trimestre = self.data.groupby(self.data['data_pedido'].dt.quarter)['valor_total'].sum()
+        vendas_trimestre = vendas_mensais.groupby(vendas_mensais.index.quarter).sum()
         trimestres = ['Q1', 'Q2', 'Q3', 'Q4']
         vendas_trimestre.index = [trimestres[i-1] for i in vendas_trimestre.index if i <= 4]
         vendas_trimestre.plot(kind='bar', ax=ax6, color=self.colors['warning'])
@@ -464,51 +720,121 @@ class EcommerceVisualizer:
                 ha='center', fontsize=10, style='italic')
         
         if save_path:
-            plt.savefig(save_path, dpi=300, bbox_inches='tight')
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', category=UserWarning)  # emojis sem glifo na fonte
+                plt.savefig(save_path, dpi=300, bbox_inches='tight')
             print(f"✅ Dashboard salvo em: {save_path}")
         
-        plt.show()
+        if show:
+            plt.show()
     
-    def export_charts(self, output_dir='reports/figures/'):
+    def export_charts(self, output_dir='reports/figures/', dpi=150, compress_level=1,
+                      jobs=EXPORT_CHARTS, verbose=True):
         """
-        Exporta todos os gráficos individuais
+        Exporta os gráficos individuais
         
         Parameters:
         -----------
         output_dir : str, default 'reports/figures/'
             Diretório para salvar os gráficos
+        dpi : int, default 150
+            Resolução dos PNGs; use 300 para impressão (4x mais pixels para
+            rasterizar e comprimir, o dashboard passa de 6000x4500)
+        compress_level : int, default 1
+            Nível zlib do PNG (0-9): 1 codifica bem mais rápido que o padrão 6,
+            com arquivos um pouco maiores
+        jobs : sequence of tuple, default EXPORT_CHARTS
+            Gráficos a exportar: (arquivo sem extensão, método, argumentos)
+        verbose : bool, default True
+            Se deve imprimir o resultado de cada gráfico
+        
+        Returns:
+        --------
+        list of tuple
+            (arquivo, mensagem de erro ou None) para cada gráfico
         """
-        import os
         os.makedirs(output_dir, exist_ok=True)
         
-        print("📊 Exportando gráficos...")
-        
-        # Lista de gráficos para exportar
-        charts = [
-            ('revenue_evolution', lambda: self.plot_revenue_evolution(period='month')),
-            ('top_products_revenue', lambda: self.plot_top_products(metric='revenue')),
-            ('category_analysis', lambda: self.plot_category_analysis()),
-            ('geographic_analysis', lambda: self.plot_geographic_analysis()),
-            ('channel_analysis', lambda: self.plot_channel_analysis()),
-            ('seasonal_analysis', lambda: self.plot_seasonal_analysis()),
-            ('customer_analysis', lambda: self.plot_customer_analysis()),
-            ('executive_dashboard', lambda: self.create_executive_dashboard())
-        ]
+        # Cada gráfico é independente e limitado por CPU (desenho + codificação PNG):
+        # com mais de um núcleo, vão para um pool de processos
+        n_workers = min(len(jobs), os.cpu_count() or 1)
+        if verbose:
+            print(f"📊 Exportando gráficos ({n_workers} processo(s))...")
         
-        for chart_name, chart_func in charts:
+        if n_workers <= 1:
+            # Backend Agg durante a exportação: nenhuma janela é aberta ou atualizada
+            backend = plt.get_backend()
+            plt.switch_backend('Agg')
             try:
-                chart_func()
-                plt.savefig(f'{output_dir}{chart_name}.png', dpi=300, bbox_inches='tight')
-                plt.close()
-                print(f"✅ {chart_name}.png exportado")
-            except Exception as e:
-                print(f"❌ Erro ao exportar {chart_name}: {str(e)}")
-        
-        print(f"🎯 Gráficos exportados para: {output_dir}")
+                resultados = [
+                    _exportar_grafico(self, chart_name, method, kwargs, output_dir, dpi, compress_level)
+                    for chart_name, method, kwargs in jobs
+                ]
+            finally:
+                plt.switch_backend(backend)  # fecha também a figura 2x2 reaproveitada
+        else:
+            rc_params = {k: v for k, v in plt.rcParams.items() if k != 'backend'}
+            # 'spawn': cada processo começa com o estado do matplotlib limpo
+            with ProcessPoolExecutor(
+                max_workers=n_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_export_worker,
+                initargs=(self.data, rc_params)
+            ) as executor:
+                futures = [
+                    executor.submit(_exportar_grafico_worker, chart_name, method, kwargs,
+                                    output_dir, dpi, compress_level)
+                    for chart_name, method, kwargs in jobs
+                ]
+                resultados = [future.result() for future in as_completed(futures)]
+        
+        if verbose:
+            for chart_name, erro in resultados:
+                if erro is None:
+                    print(f"✅ {chart_name}.png exportado")
+                else:
+                    print(f"❌ Erro ao exportar {chart_name}: {erro}")
+            
+            print(f"🎯 Gráficos exportados para: {output_dir}")
+        
+        return resultados
+
+def _exportar_grafico(visualizer, chart_name, method, kwargs, output_dir, dpi=150, compress_level=1):
+    """Desenha um gráfico sem exibi-lo e salva em PNG; devolve (nome, erro ou None)"""
+    try:
+        # Só os UserWarning do matplotlib (ex.: emojis sem glifo na fonte) são silenciados
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=UserWarning)
+            getattr(visualizer, method)(show=False, **kwargs)
+            plt.savefig(os.path.join(output_dir, f'{chart_name}.png'), dpi=dpi, bbox_inches='tight',
+                        pil_kwargs={'compress_level': compress_level})
+        return chart_name, None
+    except Exception as e:
+        return chart_name, str(e)
+    finally:
+        # A figura 2x2 do visualizador fica aberta para ser reaproveitada pelo próximo gráfico
+        for numero in plt.get_fignums():
+            if visualizer._fig_2x2 is None or numero != visualizer._fig_2x2.number:
+                plt.close(numero)
+
+# Visualizador de cada processo do pool de export_charts (criado uma vez por processo)
+_worker_visualizer = None
+
+def _init_export_worker(data, rc_params):
+    """Inicializa um processo do pool: backend sem janela, estilo do processo principal e dados"""
+    global _worker_visualizer
+    plt.switch_backend('Agg')
+    _worker_visualizer = EcommerceVisualizer(data)
+    plt.rcParams.update(rc_params)  # depois do estilo padrão aplicado pelo visualizador
+
+def _exportar_grafico_worker(chart_name, method, kwargs, output_dir, dpi, compress_level):
+    return _exportar_grafico(_worker_visualizer, chart_name, method, kwargs, output_dir, dpi, compress_level)
 
 # Função de utilidade para configuração rápida
 def setup_visualization_style():
     """Configura estilo padrão para todas as visualizações"""
+    global _estilo_aplicado
+    _estilo_aplicado = True  # o estilo padrão do módulo não deve mais sobrescrever este
     plt.style.use('seaborn-v0_8-whitegrid')
     sns.set_palette("husl")
     plt.rcParams.update({
@@ -0,0 +1,59 @@
+import os
+import sys
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from data_processing import DataProcessor, generate_sample_data, to_excel_bytes
+
+
+def _pedidos_com_duplicata_invalida():
+    """Pedido 1 repetido: a primeira linha tem valor_total nulo e a segunda é válida"""
+    return pd.DataFrame({
+        'pedido_id': [1, 1, 2, 3],
+        'produto': ['A', 'A', 'B', 'C'],
+        'data_pedido': pd.to_datetime(['2024-01-01', '2024-01-01', '2024-01-02', '2024-01-03']),
+        'quantidade': [1, 1, 2, 3],
+        'preco_unitario': [10.0, 10.0, 20.0, 30.0],
+        'valor_total': [np.nan, 10.0, 40.0, 90.0],
+    })
+
+
+@pytest.mark.parametrize('engine', ['pandas', 'polars'])
+def test_duplicata_de_linha_descartada_nao_remove_linha_valida(engine):
+    if engine == 'polars':
+        pytest.importorskip('polars')
+    processor = DataProcessor()
+    processor.load_data(data=_pedidos_com_duplicata_invalida())
+    
+    limpos = processor.clean_data(remove_outliers=False, engine=engine)
+    
+    assert sorted(limpos['pedido_id']) == [1, 2, 3]
+    assert limpos.loc[limpos['pedido_id'] == 1, 'valor_total'].tolist() == [10.0]
+
+
+def test_duplicata_com_valor_nao_positivo_nao_remove_linha_valida():
+    dados = _pedidos_com_duplicata_invalida()
+    dados.loc[0, 'valor_total'] = -10.0
+    processor = DataProcessor()
+    processor.load_data(data=dados)
+    
+    limpos = processor.clean_data(remove_outliers=False)
+    
+    assert sorted(limpos['pedido_id']) == [1, 2, 3]
+
+
+def test_to_excel_bytes_preserva_todas_as_linhas():
+    processor = DataProcessor()
+    processor.load_data(data=generate_sample_data(990))
+    limpos = processor.clean_data(remove_outliers=True).reset_index(drop=True)
+    # O Excel guarda datas com precisão de milissegundos
+    limpos['data_pedido'] = limpos['data_pedido'].dt.floor('s')
+    
+    lidos = pd.read_excel(BytesIO(to_excel_bytes(limpos)), sheet_name='Dados')
+    
+    pd.testing.assert_frame_equal(lidos.astype(limpos.dtypes.to_dict()), limpos)